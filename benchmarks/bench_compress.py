@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         bench_compress.py
+# Purpose:      Benchmark: bytes on the wire and wall time of search output transfer,
+#               no compression vs. ssh transport compression vs. gzipped remote output
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import time
+import zlib
+import codecs
+import argparse
+
+from paramiko.compress import ZlibCompressor, ZlibDecompressor
+
+# Default size (bytes) of generated search output
+OUT_SIZE = 50 * 1024 * 1024
+
+# Default link bandwidth, Mbit/s
+LINK_MBPS = 50.0
+
+# Max payload of ssh packet, each packet is compressed separately by transport compression
+SSH_PACKET_SIZE = 32768
+
+# Size of block read from ssh channel at once (as logconn.READ_BLOCK_SIZE)
+READ_BLOCK_SIZE = 65536
+
+
+def gen_output(size: int) -> bytes:
+    """
+    Generate search output: log records with SOAP messages
+
+    :param size: Approximate size, bytes
+    :return: Output
+    """
+    lines = []
+    n = 0
+    i = 0
+    while n < size:
+        line = ('./server.log.2019-01-09:{0}:2019-01-09 09:{1:02d}:{2:02d},{3:03d} INFO  [com.xyz.Orders] '
+                '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+                '<ns2:createOrder xmlns:ns2="http://xyz.com/orders"><ns2:correlationId>{4:08x}-cafe-4bad-9f00-{0:012d}'
+                '</ns2:correlationId><ns2:sender>CRM</ns2:sender><ns2:orderId>{0}</ns2:orderId>'
+                '<ns2:status><ns2:code>{5}</ns2:code></ns2:status></ns2:createOrder></soap:Body></soap:Envelope>\n'
+                ).format(i + 1, i // 3600 % 60, i // 60 % 60, i % 1000, i * 2654435761 % 2 ** 32, i % 7)
+        lines.append(line)
+        n += len(line)
+        i += 1
+    return ''.join(lines).encode('utf-8')
+
+
+def read_lines(blocks, inflate_fun=None) -> int:
+    """
+    Client side of transfer: blocks are inflated and split into lines as SSHNodeConn.exec_cmd_iter does
+
+    :param blocks: Received blocks
+    :param inflate_fun: Function inflating block, None - block is not compressed
+    :return: Count of lines
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    tail = ''
+    n = 0
+    for block in blocks:
+        if inflate_fun is not None:
+            block = inflate_fun(block)
+        lines = (tail + decoder.decode(block)).split('\n')
+        tail = lines.pop()
+        n += len(lines)
+    return n
+
+
+def split(data: bytes, size: int) -> [bytes]:
+    return [data[i: i + size] for i in range(0, len(data), size)]
+
+
+def run_none(data: bytes) -> [int, float]:
+    """
+    Plain output
+
+    :return: Bytes on the wire, CPU time (sec.)
+    """
+    t = time.perf_counter()
+    read_lines(split(data, READ_BLOCK_SIZE))
+    return len(data), time.perf_counter() - t
+
+
+def run_transport(data: bytes) -> [int, float]:
+    """
+    SSH transport compression: every packet is deflated with full flush (paramiko 'compress=True')
+
+    :return: Bytes on the wire, CPU time (sec.)
+    """
+    t = time.perf_counter()
+    compressor = ZlibCompressor()
+    packets = [compressor(p) for p in split(data, SSH_PACKET_SIZE)]
+    decompressor = ZlibDecompressor()
+    read_lines(packets, decompressor)
+    return sum(len(p) for p in packets), time.perf_counter() - t
+
+
+def run_gzip(data: bytes) -> [int, float]:
+    """
+    Remote output piped through 'gzip -1', inflated while reading (compress="gzip")
+
+    :return: Bytes on the wire, CPU time (sec.)
+    """
+    t = time.perf_counter()
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    gz = compressor.compress(data) + compressor.flush()
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    read_lines(split(gz, READ_BLOCK_SIZE), inflater.decompress)
+    return len(gz), time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search output compression benchmark')
+    parser.add_argument('--size', type=int, default=OUT_SIZE, help='size of search output, bytes')
+    parser.add_argument('--mbps', type=float, default=LINK_MBPS, help='link bandwidth, Mbit/s')
+    args = parser.parse_args()
+
+    data = gen_output(args.size)
+    cases = [('none', run_none), ('transport', run_transport), ('gzip', run_gzip)]
+
+    print('output: {0} bytes, link: {1} Mbit/s'.format(len(data), args.mbps))
+    print('%-10s %14s %8s %10s %12s' % ('compress', 'wire, bytes', 'ratio', 'cpu, s', 'wall, s'))
+    for name, fun in cases:
+        wire, cpu = fun(data)
+        wall = cpu + wire * 8 / (args.mbps * 1e6)  # compression, inflating + transfer by the link
+        print('%-10s %14d %8.1f %10.3f %12.3f' % (name, wire, len(data) / wire, cpu, wall))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         bench_pipeline.py
+# Purpose:      Benchmark of search pipeline hot paths on synthetic logs served by local stand-in connection:
+#               record grouping, sorting, message columns, tag values, XML indent, whole nodegroup search,
+#               record grouping and message columns with post-processing pool. Results are written as JSON lines
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yattag import indent
+
+import conn
+import logconn
+import msgtable
+from regexes import registry
+from msgcache import indent_cache
+from postproc import postprocessor, POSTPROC_MIN_RECORDS, POSTPROC_BATCH_SIZE, POSTPROC_WORKERS
+
+import loggen
+
+# Default count of runs of each case (the best time is reported)
+N_REPEAT = 3
+
+# Searched log file
+FILE_NAME = './server.log'
+
+# Message columns and sorting regex of sample configuration
+SORT_EXPR = r"(?:.*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"
+MSG_COLUMNS = [conn.ColumnPattern('DateTime', r"(?:.*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})(?:\s)", False),
+               conn.ColumnPattern('Interface', r"(?:.*\sINFO\s*\[.*\.)(\w*)(?:\].*)", False),
+               conn.ColumnPattern('Message', r"(?is)(?:.*<(?:soap-env|soap):body>[^<]*<.*?:)(\w*)", True),
+               conn.ColumnPattern('Sender', 'sender', False, msgtable.COL_TYPE_XML_TAG),
+               conn.ColumnPattern('Status', 'code', False, msgtable.COL_TYPE_XML_TAG),
+               conn.ColumnPattern('OrderId', 'orderId', False, msgtable.COL_TYPE_XML_TAG)]
+
+# Tag read by 'get_tag_value'
+TAG = 'correlationId'
+
+
+class LocalConn(conn.ConnABC):
+    """
+    Stand-in connection to file node: serves prepared search output without ssh
+    """
+
+    def __init__(self, out: [str]):
+        """
+        Class constructor
+
+        :param out: Search output lines
+        """
+        self.out = out
+        self.is_cancelled = False
+
+    def connect(self, **conn_args):
+        return None
+
+    def exec_cmd(self, cmd: str) -> [str]:
+        return self.out
+
+    def exec_cmd_iter(self, cmd: str, is_gzip: bool = False):
+        return iter(self.out)
+
+    def close(self):
+        return None
+
+
+def make_nodegroup(outputs: [[str]]) -> [logconn.SSHNodeGroup, conn.Source]:
+    """
+    Make nodegroup of nodes served by local connections
+
+    :param outputs: Search output of each node
+    :return: Nodegroup, searched source
+    """
+    nodes = []
+    for i, out in enumerate(outputs):
+        node = logconn.SSHNode(None, 'Node {0}'.format(i + 1), 'node{0}'.format(i + 1), '', '', '.', '', '')
+        node.conn = LocalConn(out)
+        nodes.append(node)
+
+    source = conn.Source('server.log', 'server.log*', None, [], conn.SOURCE_MODE_BLOCK)
+    patterns = conn.Patterns(conn.SortPattern(SORT_EXPR, True), MSG_COLUMNS)
+    return logconn.SSHNodeGroup(None, 'bench', 'file', nodes, [source], patterns), source
+
+
+def bench_prepare_out(ng: logconn.SSHNodeGroup, source: conn.Source, outputs: [[str]]) -> int:
+    """
+    SSHNode.prepare_out_str: grouping of lines into records, XML indent of records
+    """
+    indent_cache.clear()
+    n = 0
+    for node, out in zip(ng.nodes, outputs):
+        records, _ = node.prepare_out_str(out, source)
+        n += len(records)
+    return n
+
+
+def bench_sort(ng: logconn.SSHNodeGroup, records: list) -> int:
+    """
+    SSHNodeGroup.sort_fun + sort of records of all nodes
+    """
+    return len(sorted(records, key=ng.sort_fun))
+
+
+def bench_search(ng: logconn.SSHNodeGroup, source: conn.Source) -> int:
+    """
+    SSHNodeGroup.search: nodes in parallel, records merged by date-time
+    """
+    indent_cache.clear()
+    return len(ng.search(source.name, 'soap', ''))
+
+
+def bench_columns(text_lst: [str]) -> int:
+    """
+    Message list columns (as MsgListCtrl): messages found by main column, then all cells are read
+    """
+    extractor = msgtable.ColumnExtractor(MSG_COLUMNS)
+    main_column = [col.is_main for col in MSG_COLUMNS].index(True)
+    table = postprocessor.extract_messages(extractor, main_column, text_lst, 0)
+    for row in range(len(table)):
+        table.get_row(row)
+    return len(table)
+
+
+def bench_tag_value(text_lst: [str]) -> int:
+    """
+    MainFrame.get_tag_value for each record
+    """
+    p = registry.tag_value(TAG)
+    return sum(1 for text in text_lst if p.search(text))
+
+
+def bench_indent(xml_lst: [str]) -> int:
+    """
+    yattag.indent of each record (not cached)
+    """
+    for text in xml_lst:
+        indent(text)
+    return len(xml_lst)
+
+
+def timed(repeat: int, fun, *args) -> [float, int]:
+    """
+    Run function 'repeat' times
+
+    :return: Best elapsed time (sec.), count of processed records
+    """
+    best = None
+    n = 0
+    for _ in range(repeat):
+        t = time.perf_counter()
+        n = fun(*args)
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+    return best, n
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search pipeline benchmark, results as JSON lines')
+    parser.add_argument('--records', type=int, default=loggen.N_RECORDS, help='count of records per node')
+    parser.add_argument('--xml-size', type=int, default=loggen.XML_SIZE, help='approx. size of SOAP message, bytes')
+    parser.add_argument('--nodes', type=int, default=loggen.N_NODES, help='count of nodes')
+    parser.add_argument('--skew', type=int, default=loggen.CLOCK_SKEW, help='max clock skew of nodes, ms')
+    parser.add_argument('--repeat', type=int, default=N_REPEAT, help='count of runs of each case')
+    parser.add_argument('--postproc-workers', type=int, default=POSTPROC_WORKERS,
+                        help='count of processes of post-processing pool, 0 - count of CPUs')
+    args = parser.parse_args()
+
+    logs = loggen.gen_nodes(args.nodes, args.records, args.xml_size, args.skew)
+    outputs = [loggen.block_output(lines, FILE_NAME) for lines in logs]
+    ng, source = make_nodegroup(outputs)
+
+    # inputs of later stages: records of all nodes, their text as shown
+    records = []
+    for node, out in zip(ng.nodes, outputs):
+        records.extend(node.node_record(record) for record in node.prepare_out_str(out, source)[0])
+    text_lst = [str(record) for record in records]
+    xml_lst = [record.body for record in records]
+
+    print(json.dumps({'params': {'records': args.records, 'xml_size': args.xml_size, 'nodes': args.nodes,
+                                 'skew': args.skew, 'repeat': args.repeat, 'postproc_workers': args.postproc_workers,
+                                 'bytes': sum(len(line) for lines in logs for line in lines)}}))
+
+    cases = [('prepare_out_str', bench_prepare_out, ng, source, outputs),
+             ('sort', bench_sort, ng, records),
+             ('msg_columns', bench_columns, text_lst),
+             ('get_tag_value', bench_tag_value, text_lst),
+             ('indent', bench_indent, xml_lst),
+             ('search', bench_search, ng, source),
+             ('prepare_out_str (pool)', bench_prepare_out, ng, source, outputs),
+             ('msg_columns (pool)', bench_columns, text_lst)]
+    for name, fun, *fun_args in cases:
+        if name.endswith('(pool)'):
+            postprocessor.configure(True, POSTPROC_MIN_RECORDS, POSTPROC_BATCH_SIZE, args.postproc_workers)
+            postprocessor.get_pool().submit(int).result()  # processes are started before timing
+        elapsed, n = timed(args.repeat, fun, *fun_args)
+        print(json.dumps({'case': name, 'records': n, 'seconds': round(elapsed, 6),
+                          'us_per_record': round(elapsed * 1e6 / max(n, 1), 3)}))
+        sys.stdout.flush()
+
+    postprocessor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
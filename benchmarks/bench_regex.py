@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         bench_regex.py
+# Purpose:      Benchmark: per-line regex work on grep result, compiled patterns vs. compiling on each call
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import regexes
+from regexes import registry
+
+# Default count of lines of generated grep result
+N_LINES = 500000
+
+# Column regexes of sample configuration
+COLUMN_EXPRS = [r"(?:.*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})(?:\s)",
+                r"(?:.*\sINFO\s*\[.*\.)(\w*)(?:\].*)",
+                r"(?is)(?:.*<(?:soap-env|soap):body>[^<]*<.*?:)(\w*)"]
+
+
+def gen_lines(n_lines: int) -> [str]:
+    """
+    Generate grep result: header line followed by 3 xml lines
+
+    :param n_lines: Count of lines
+    :return: Lines
+    """
+    lines = []
+    for i in range(n_lines):
+        if i % 4 == 0:
+            lines.append('./server.log.2019-01-09:%d:2019-01-09 09:%02d:%02d,%03d INFO  [com.xyz.Orders] '
+                         '<soap:Envelope><soap:Body>\n' % (i + 1, i // 60 % 60, i % 60, i % 1000))
+        else:
+            lines.append('./server.log.2019-01-09:%d:    <ns2:orderId>%d</ns2:orderId>\n' % (i + 1, i))
+    return lines
+
+
+def prepare_lines_before(lines: [str]) -> int:
+    """
+    Per-line regex work of SSHNode.prepare_out_str before: patterns compiled on each call,
+    prefix removed by re.sub with string pattern
+    """
+    pattern_dt = r"(^[^:]*:[0-9]*:\s*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"
+    p_dt = re.compile(pattern_dt)
+    pattern_xml = r".*<\/?.*?:?.+?>"
+    p_xml = re.compile(pattern_xml)
+    pattern_pref = r"(^[^:]*:[0-9]*:\s*)(.*)"
+
+    n = 0
+    for line in lines:
+        if p_dt.match(line):
+            n += 1
+        else:
+            line = re.sub(pattern_pref, r'\2', line, 1)
+            if p_xml.match(line):
+                n += 1
+    return n
+
+
+def prepare_lines_after(lines: [str]) -> int:
+    """
+    Per-line regex work of SSHNode.prepare_out_iter: patterns from registry, prefix removed by slicing
+    """
+    p_dt = regexes.P_DT
+    p_xml = regexes.P_XML
+    p_pref = regexes.P_PREF
+
+    n = 0
+    for line in lines:
+        if p_dt.match(line):
+            n += 1
+        else:
+            m = p_pref.match(line)
+            if m:
+                line = line[m.end():]
+            if p_xml.match(line):
+                n += 1
+    return n
+
+
+def columns_before(lines: [str], chunk_size: int) -> int:
+    """
+    Column extraction before: column regexes compiled on each list refresh (chunk)
+    """
+    n = 0
+    for i in range(0, len(lines), chunk_size):
+        p = [re.compile(expr) for expr in COLUMN_EXPRS]
+        for line in lines[i: i + chunk_size]:
+            n += sum(1 for pv in p if pv.match(line))
+    return n
+
+
+def columns_after(lines: [str], chunk_size: int) -> int:
+    """
+    Column extraction after: column regexes taken from registry
+    """
+    p = [registry.get(expr) for expr in COLUMN_EXPRS]
+    n = 0
+    for i in range(0, len(lines), chunk_size):
+        for line in lines[i: i + chunk_size]:
+            n += sum(1 for pv in p if pv.match(line))
+    return n
+
+
+def tag_value_before(lines: [str], tag: str) -> int:
+    """
+    MainFrame.get_tag_value before: pattern formatted and looked up in re cache for each line
+    """
+    pattern = r"(?:.*<.*?:{0}>)(.+?)(?:<\/.*?:{0}>)(?:.*)"
+    return sum(1 for line in lines if re.search(pattern.format(tag), line))
+
+
+def tag_value_after(lines: [str], tag: str) -> int:
+    """
+    MainFrame.get_tag_value after: pattern taken from registry
+    """
+    return sum(1 for line in lines if registry.tag_value(tag).search(line))
+
+
+def timed(fun, *args) -> float:
+    """
+    Run function, get elapsed time
+
+    :return: Elapsed time, sec.
+    """
+    t = time.perf_counter()
+    fun(*args)
+    return time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-line regex benchmark')
+    parser.add_argument('--lines', type=int, default=N_LINES, help='count of lines of grep result')
+    args = parser.parse_args()
+
+    lines = gen_lines(args.lines)
+    cases = [('prepare_out_str', (prepare_lines_before, lines), (prepare_lines_after, lines)),
+             ('msg columns', (columns_before, lines, 1000), (columns_after, lines, 1000)),
+             ('get_tag_value', (tag_value_before, lines, 'orderId'), (tag_value_after, lines, 'orderId'))]
+
+    print('%-16s %12s %12s %14s %14s' % ('case', 'before, s', 'after, s', 'before, ns/ln', 'after, ns/ln'))
+    for name, before, after in cases:
+        t_before = timed(*before)
+        t_after = timed(*after)
+        print('%-16s %12.3f %12.3f %14.0f %14.0f' % (name, t_before, t_after,
+                                                      t_before * 1e9 / len(lines), t_after * 1e9 / len(lines)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         bench_startup.py
+# Purpose:      Benchmark: cold start of command line mode (python loganalyzer.py ... list),
+#               wall time and backend drivers / GUI modules loaded at startup
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default count of runs
+N_RUNS = 10
+
+# Target of cold start (ms): reading configuration without connecting to nodes
+COLD_START_TARGET = 300
+
+# Modules that must not be loaded at startup: GUI, backend drivers (loaded by the first connect)
+HEAVY_MODULES = ['wx', 'paramiko', 'cx_Oracle']
+
+
+def run_once(conf_filename: str) -> float:
+    """
+    Run command line mode once
+
+    :return: Wall time, ms
+    """
+    t = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'loganalyzer.py'), '--config', conf_filename, 'list'],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - t) * 1000
+
+
+def loaded_modules(conf_filename: str) -> [str]:
+    """
+    Get heavy modules loaded at startup
+
+    :return: Module names
+    """
+    res = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(ROOT_DIR, 'loganalyzer.py'),
+                          '--config', conf_filename, 'list'],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    names = set(line.rsplit('|', 1)[-1].strip() for line in res.stderr.splitlines())
+    return [name for name in HEAVY_MODULES if name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Command line mode cold start benchmark')
+    parser.add_argument('--config', default=os.path.join(ROOT_DIR, 'loganalyzer.config.xml(sample)'),
+                        help='configuration file')
+    parser.add_argument('--runs', type=int, default=N_RUNS, help='count of runs')
+    args = parser.parse_args()
+
+    times = [run_once(args.config) for _ in range(args.runs)]
+    loaded = loaded_modules(args.config)
+
+    print('%-10s %10s %10s %10s %8s  %s' % ('runs', 'min, ms', 'median, ms', 'target, ms', 'status', 'loaded'))
+    median = statistics.median(times)
+    print('%-10d %10.1f %10.1f %10d %8s  %s' % (args.runs, min(times), median, COLD_START_TARGET,
+                                               'ok' if median <= COLD_START_TARGET and not loaded else 'FAIL',
+                                               ','.join(loaded) or '-'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         loggen.py
+# Purpose:      Synthetic JBoss server.log generator: records with SOAP messages of several nodes,
+#               used by benchmarks (can also write log files for local tests)
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Defaults: count of records per node, approx. size (bytes) of SOAP message, count of nodes, clock skew (ms)
+N_RECORDS = 20000
+XML_SIZE = 1000
+N_NODES = 3
+CLOCK_SKEW = 250
+
+# Start time of generated logs
+START_TIME = datetime(2019, 1, 9, 9, 0, 0)
+
+INTERFACES = ['Orders', 'Billing', 'Customers', 'Inventory']
+OPERATIONS = ['createOrder', 'cancelOrder', 'getStatus', 'updateCustomer']
+SENDERS = ['CRM', 'WEB', 'POS', 'BATCH']
+
+
+def gen_record(i: int, node: int, ts: datetime, xml_size: int, rnd: random.Random) -> [str]:
+    """
+    Generate log record: header line with date-time followed by lines of SOAP message
+
+    :param i: Record number
+    :param node: Node number
+    :param ts: Record date-time
+    :param xml_size: Approx. size of SOAP message, bytes
+    :param rnd: Random generator
+    :return: Record lines
+    """
+    op = OPERATIONS[i % len(OPERATIONS)]
+    lines = ['{0},{1:03d} INFO  [com.xyz.{2}] (default task-{3}) <soap:Envelope '
+             'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">\n'.format(
+                ts.strftime('%Y-%m-%d %H:%M:%S'), ts.microsecond // 1000, INTERFACES[i % len(INTERFACES)], i % 64),
+             '<soap:Body>\n',
+             '<ns2:{0} xmlns:ns2="http://xyz.com/orders">\n'.format(op),
+             '<ns2:correlationId>{0:08x}-cafe-4bad-9f00-{1:04d}{2:08d}</ns2:correlationId>\n'.format(
+                 rnd.getrandbits(32), node, i // 2),  # request and response share correlationId
+             '<ns2:sender>{0}</ns2:sender>\n'.format(SENDERS[rnd.randrange(len(SENDERS))]),
+             '<ns2:orderId>{0}</ns2:orderId>\n'.format(node * 10000000 + i),
+             '<ns2:status><ns2:code>{0}</ns2:code></ns2:status>\n'.format(rnd.randrange(8))]
+    size = sum(len(line) for line in lines)
+    while size < xml_size:
+        line = '<ns2:item><ns2:sku>SKU-{0:06d}</ns2:sku><ns2:qty>{1}</ns2:qty></ns2:item>\n'.format(
+            rnd.randrange(1000000), rnd.randrange(1, 10))
+        lines.append(line)
+        size += len(line)
+    lines.extend(['</ns2:{0}>\n'.format(op), '</soap:Body>\n', '</soap:Envelope>\n'])
+    return lines
+
+
+def gen_log(n_records: int = N_RECORDS, xml_size: int = XML_SIZE, node: int = 0, skew: int = 0,
+            seed: int = 0) -> [str]:
+    """
+    Generate server.log of node
+
+    :param n_records: Count of records
+    :param xml_size: Approx. size of SOAP message, bytes
+    :param node: Node number
+    :param skew: Clock skew of node, ms
+    :param seed: Random seed
+    :return: Log lines
+    """
+    rnd = random.Random(seed * 1000 + node)
+    ts = START_TIME + timedelta(milliseconds=skew)
+    lines = []
+    for i in range(n_records):
+        ts += timedelta(milliseconds=rnd.randrange(1, 200))
+        lines.extend(gen_record(i, node, ts, xml_size, rnd))
+    return lines
+
+
+def gen_nodes(n_nodes: int = N_NODES, n_records: int = N_RECORDS, xml_size: int = XML_SIZE, skew: int = CLOCK_SKEW,
+              seed: int = 0) -> [[str]]:
+    """
+    Generate logs of nodes, clock of node i is shifted by random value up to 'skew' ms
+
+    :return: Log lines of each node
+    """
+    rnd = random.Random(seed)
+    return [gen_log(n_records, xml_size, node, rnd.randint(-skew, skew) if skew else 0, seed)
+            for node in range(n_nodes)]
+
+
+def block_output(lines: [str], file_name: str) -> [str]:
+    """
+    Convert log lines to output of built-in block search (source mode="block"):
+    header lines of records are prefixed by 'file:line:'
+
+    :param lines: Log lines
+    :param file_name: File name
+    :return: Search output lines
+    """
+    res = []
+    for i, line in enumerate(lines, 1):
+        if line[:2] == '20' and line[4:5] == '-':  # date-time header
+            res.append('{0}:{1}:{2}'.format(file_name, i, line))
+        else:
+            res.append(line)
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic server.log generator')
+    parser.add_argument('dir', help='output directory, logs are written to <dir>/node<N>/server.log')
+    parser.add_argument('--records', type=int, default=N_RECORDS, help='count of records per node')
+    parser.add_argument('--xml-size', type=int, default=XML_SIZE, help='approx. size of SOAP message, bytes')
+    parser.add_argument('--nodes', type=int, default=N_NODES, help='count of nodes')
+    parser.add_argument('--skew', type=int, default=CLOCK_SKEW, help='max clock skew of nodes, ms')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    for node, lines in enumerate(gen_nodes(args.nodes, args.records, args.xml_size, args.skew, args.seed)):
+        node_dir = os.path.join(args.dir, 'node{0}'.format(node + 1))
+        os.makedirs(node_dir, exist_ok=True)
+        with open(os.path.join(node_dir, 'server.log'), 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+
+if __name__ == "__main__":
+    main()
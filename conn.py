@@ -11,10 +11,18 @@
 # Created:      2019-01-16
 # ----------------------------------------------------------------------------
 
+import time
+import queue
+import threading
 from abc import ABC, abstractmethod
 from lxml import etree as et
-from typing import Callable, Optional
+from typing import Callable, Optional, Iterator
 from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+
+import merge
+from logrecord import LogRecord
+from regexes import registry
 
 # In-application tracing messages
 
@@ -23,14 +31,35 @@ CONF_READ_ERR = "Configuration loading error, file: '{}'"
 CONN_START = "Connecting to '{}'"
 CONN_OK = " - OK"
 CONN_FAILED = " - FAILED"
+CONN_REUSED = " - OK (open connection)"
 CONN_CLOSED = "Connection to '{}' was closed\n\n"
 
 INFO_SEARCH = "Search for '{0}' in '{1}' with date >= '{2}'"
+INFO_FOLLOW = "Search for '{0}' in data added to '{1}'"
 INFO_EXEC_CMD = "Execute command '{}'"
+INFO_EXEC_FAILED = "'{}': command failed, [{}]"
+INFO_NODE_COMPLETED = "'{}': {} line(s) found"
 INFO_OPERATION_COMPLETED = 'Operation completed, {} line(s) found'
+INFO_OPERATION_CANCELLED = 'Operation cancelled, {} line(s) found'
 
 TracingFun = Callable
 
+# Callback progress function: (count of completed nodes, count of nodes, count of lines found)
+ProgressFun = Callable
+
+# Default count of output records passed through the search pipeline at once
+CHUNK_SIZE = 1000
+
+# Max count of chunks buffered between node workers and consumer of nodegroup output
+CHUNK_QUEUE_SIZE = 16
+
+# Source modes: source expression is a command (query), built-in search of log records (multi-line blocks)
+SOURCE_MODE_CMD = 'cmd'
+SOURCE_MODE_BLOCK = 'block'
+
+# Xml tags indexed to find related messages, if nodegroup does not set them
+DEFAULT_KEY_TAGS = ['correlationId']
+
 
 class SortPattern():
     """
@@ -47,23 +76,29 @@ class SortPattern():
         self.expr = expr
         self.is_active = is_active
 
+        self.p_expr = registry.get(expr)  # compiled regex, None - sorting by whole line
+
 
 class ColumnPattern():
     """
     Column pattern
     """
 
-    def __init__(self, name: str, expr: str, is_main: bool):
+    def __init__(self, name: str, expr: str, is_main: bool, col_type: str = 'regex'):
         """
         Class constructor
 
         :param name: Column name
-        :param expr: Regex for column value extracting
+        :param expr: Regex for column value extracting ('regex' type) or tag name ('xml-tag' type)
         :param is_main: Is main column?
+        :param col_type: Column type: 'regex' - value extracted by regex, 'xml-tag' - value of xml tag
         """
         self.name = name
         self.expr = expr
         self.is_main = is_main
+        self.col_type = col_type
+
+        self.p_expr = registry.get(expr) if col_type == 'regex' else None  # compiled regex
 
 
 # List of column patterns
@@ -72,18 +107,38 @@ ColumnPatterns = [ColumnPattern]
 
 class Patterns():
     """
-    Patterns (sorting, [columns])
+    Patterns (sorting, [columns], [key tags])
     """
 
-    def __init__(self, sort: SortPattern, msg_columns: ColumnPatterns):
+    def __init__(self, sort: SortPattern, msg_columns: ColumnPatterns, key_tags: [str] = None):
         """
         Class constructor
 
         :param sort: Sorting pattern
         :param msg_columns: List of column patterns
+        :param key_tags: Names of xml tags indexed to find related messages, None - DEFAULT_KEY_TAGS
         """
         self.sort = sort
         self.msg_columns = msg_columns
+        self.key_tags = key_tags if key_tags else DEFAULT_KEY_TAGS
+
+    @property
+    def p_sort(self):
+        """
+        Compiled sorting regex
+
+        :return: Compiled regex, None - sorting by whole line
+        """
+        return self.sort.p_expr if self.sort is not None else None
+
+    @property
+    def p_msg_columns(self) -> list:
+        """
+        Compiled column regexes
+
+        :return: List of compiled regexes
+        """
+        return [col.p_expr for col in self.msg_columns]
 
 
 class OutField():
@@ -111,18 +166,21 @@ class Source():
     Source to which the search is applied
     """
 
-    def __init__(self, name: str, source_name: str, expr: str, fields: OutFields):
+    def __init__(self, name: str, source_name: str, expr: str, fields: OutFields, mode: str = SOURCE_MODE_CMD):
         """
         Class constructor
 
         :param name: Source name (in case file search - the file mask)
         :param expr: Source expression: unix command, sql statement etc.
         :param fields: Output formatting fields
+        :param mode: Source mode: SOURCE_MODE_CMD - expression is executed,
+                     SOURCE_MODE_BLOCK - built-in search of log records, expression is not used
         """
         self.name = name
         self.source_name = source_name
         self.expr = expr
         self.fields = fields
+        self.mode = mode
 
 
 # List of sources
@@ -153,6 +211,17 @@ class ConnABC(ABC):
         """
         return None
 
+    def exec_cmd_iter(self, cmd: str) -> Iterator:
+        """
+        Executing command on open connection, stdout is read incrementally
+
+        :param cmd: command string
+        :return: stdout iterator
+        """
+        out = self.exec_cmd(cmd)
+        if out:
+            yield from out
+
     @abstractmethod
     def close(self):
         """
@@ -160,6 +229,115 @@ class ConnABC(ABC):
         """
         return None
 
+    def is_alive(self) -> bool:
+        """
+        Health check of open connection
+
+        :return: Is connection usable?
+        """
+        return True
+
+    def cancel(self):
+        """
+        Cancel running command (called from other thread)
+        """
+        return None
+
+
+class ConnPool:
+    """
+    Pool of open low-level connections, kept alive between operations
+    """
+
+    def __init__(self, idle_timeout: float):
+        """
+        Class constructor
+
+        :param idle_timeout: Idle time (sec.) after which an unused connection is closed
+        """
+        self.idle_timeout = idle_timeout
+
+        self.lock = threading.Lock()
+        self.conns = {}  # key -> list of idle connections [(conn, release time)]
+
+        self.sweeper = None  # background thread closing expired connections
+        self.stopped = threading.Event()
+
+    def acquire(self, key) -> Optional[ConnABC]:
+        """
+        Take open connection from pool
+
+        :param key: Connection key
+        :return: Healthy open connection, None - no connection in pool
+        """
+        self.evict_idle()
+        while True:
+            with self.lock:
+                items = self.conns.get(key)
+                if not items:
+                    return None
+                conn, _ = items.pop()
+
+            if conn.is_alive():
+                return conn
+            ConnPool.close_conn(conn)  # dead transport: drop it and try next one
+
+    def release(self, key, conn: ConnABC):
+        """
+        Return open connection to pool
+
+        :param key: Connection key
+        :param conn: Connection
+        """
+        with self.lock:
+            self.conns.setdefault(key, []).append((conn, time.monotonic()))
+            if self.sweeper is None:
+                self.sweeper = threading.Thread(target=self.sweep, daemon=True)
+                self.sweeper.start()
+
+    def evict_idle(self):
+        """
+        Close connections that were not used during 'idle_timeout'
+        """
+        expired = []
+        deadline = time.monotonic() - self.idle_timeout
+        with self.lock:
+            for key, items in self.conns.items():
+                expired.extend([conn for conn, released in items if released < deadline])
+                items[:] = [item for item in items if item[1] >= deadline]
+
+        for conn in expired:
+            ConnPool.close_conn(conn)
+
+    def sweep(self):
+        """
+        Periodic eviction of expired connections (background thread)
+        """
+        while not self.stopped.wait(min(self.idle_timeout, 60)):
+            self.evict_idle()
+
+    def close_all(self):
+        """
+        Close all connections in pool
+        """
+        self.stopped.set()
+        with self.lock:
+            items = [item for items in self.conns.values() for item in items]
+            self.conns = {}
+
+        for conn, _ in items:
+            ConnPool.close_conn(conn)
+
+    @staticmethod
+    def close_conn(conn: ConnABC):
+        """
+        Close connection ignoring errors
+        """
+        try:
+            conn.close()
+        except Exception as ex:
+            pass
+
 
 class Node(ABC):
     """
@@ -179,6 +357,8 @@ class Node(ABC):
 
         self.conn = self.create_conn()  # Create low-level connection instance
         self.connected: bool = False  # is connected?
+        self.pool: Optional[ConnPool] = None  # pool of open connections, assigned by node group
+        self.can_sort: bool = True  # can output of last operation be sorted?
 
     def create_conn(self):
         """
@@ -196,6 +376,15 @@ class Node(ABC):
         trace_str = ""
         try:
             trace_str = CONN_START.format(self.conn_args['node_name'])
+            if self.pool is not None:
+                conn = self.pool.acquire(self.pool_key())
+                if conn is not None:  # skip connecting, use open connection
+                    self.conn = conn
+                    self.connected = True
+                    trace_str += CONN_REUSED
+                    return self.connected
+
+                self.conn = self.create_conn()
             self.conn.connect(**self.conn_args)
 
         except Exception as ex:
@@ -230,6 +419,17 @@ class Node(ABC):
         """
         return out, True
 
+    def prepare_out_iter(self, out: Iterator, source: Source) -> Iterator:
+        """
+        Prepare output strings (search result) incrementally, sets 'can_sort' flag
+
+        :param out: Output iterator
+        :param source: Source
+        :return: Output iterator of strings or records (LogRecord with parsed header)
+        """
+        out_list, self.can_sort = self.prepare_out_str(list(out), source)
+        yield from out_list
+
     def prepare_search_cmd(self, source: Source, search_str: str, search_date: str) -> str:
         """
         Prepare search command
@@ -249,60 +449,143 @@ class Node(ABC):
 
         return cmd
 
-    def exec_cmd(self, source: Source, cmd: str) -> [[str], bool]:
+    def exec_cmd_iter(self, source: Source, cmd: str) -> Iterator[LogRecord]:
         """
-        Execute command on node
+        Execute command on node, output is produced incrementally
 
         :param source: Source
         :param cmd: Command
-        :return: Stdout, list
+        :return: Output records iterator
         """
-        res_lst = []
-        can_sort = False
+        self.can_sort = False
         if self.conn is not None:
             if self.trace_fun:
                 self.trace_fun(INFO_EXEC_CMD.format(cmd))
             try:
                 cmd_prepared = self.prepare_in_cmd(source, cmd)
-                out = self.conn.exec_cmd(cmd_prepared)
-                out_list, can_sort = self.prepare_out_str(out, source)
-                res_lst.extend([self.name + ':' + line for line in out_list])
+                out = self.read_out_iter(source, cmd_prepared)
+                for line in self.prepare_out_iter(out, source):
+                    yield self.node_record(line)
             except Exception as ex:
-                res_lst.clear()
+                self.can_sort = False
+                if self.trace_fun:
+                    self.trace_fun(INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
 
-        return res_lst, can_sort
+    def node_record(self, line) -> LogRecord:
+        """
+        Make output record of node
 
-    def search(self, source: Source, search_str: str, search_date: str) -> [[str], bool]:
+        :param line: Record produced by prepare_out_iter (LogRecord) or output string
+        :return: Record with node name
         """
-        Do search for _search_str_ in file(s) with file name mask _search_file_ with date >= _search_date_
+        if not isinstance(line, LogRecord):
+            line = LogRecord(line)
+        line.node = self.name
+        return line
+
+    def read_out_iter(self, source: Source, cmd: str) -> Iterator[str]:
+        """
+        Execute prepared command on open connection
+
+        :param source: Source
+        :param cmd: Prepared command
+        :return: Raw output strings iterator
+        """
+        return self.conn.exec_cmd_iter(cmd)
+
+    def exec_cmd(self, source: Source, cmd: str) -> [[LogRecord], bool]:
+        """
+        Execute command on node
+
+        :param source: Source
+        :param cmd: Command
+        :return: Output records, list
+        """
+        res_lst = list(self.exec_cmd_iter(source, cmd))
+        return res_lst, self.can_sort
+
+    def search_iter(self, source: Source, search_str: str, search_date: str) -> Iterator[LogRecord]:
+        """
+        Do search, search result is produced incrementally
 
         :param source: Source
         :param search_str: Search string
         :param search_date: Search date in format "YYYY-MM-DD", used if not empty for search with date >= search_date
-        :return: Search result, List [str]
+        :return: Search result iterator
         """
-        res_lst = []
         if self.conn is not None:
-            """              
-            if self.trace_fun:
-                self.trace_fun(INFO_SEARCH.format(search_str=search_str, source_name=source.source_name, search_date=search_date))
-            """
             cmd = self.prepare_search_cmd(source, search_str, search_date)
-            out_list, can_sort = self.exec_cmd(source, cmd)
-            res_lst.extend(out_list)
+            yield from self.exec_cmd_iter(source, cmd)
 
-        return res_lst, can_sort
+    def search(self, source: Source, search_str: str, search_date: str) -> [[LogRecord], bool]:
+        """
+        Do search for _search_str_ in file(s) with file name mask _search_file_ with date >= _search_date_
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD", used if not empty for search with date >= search_date
+        :return: Search result, List [str]
+        """
+        self.can_sort = True
+        res_lst = list(self.search_iter(source, search_str, search_date))
+        return res_lst, self.can_sort
+
+    def follow_start_iter(self, source: Source) -> Iterator[str]:
+        """
+        Remember current end of source: start of follow mode (search in data added since the previous search).
+        Follow mode is not supported by default
+
+        :param source: Source
+        :return: Empty iterator
+        """
+        yield from ()
+
+    def follow_iter(self, source: Source, search_str: str) -> Iterator[LogRecord]:
+        """
+        Search in data added to source since the previous search (follow mode), not supported by default
+
+        :param source: Source
+        :param search_str: Search string
+        :return: Search result iterator
+        """
+        yield from ()
+
+    def cancel(self):
+        """
+        Cancel running operation (called from other thread)
+        """
+        if (self.conn is not None) and self.connected:
+            self.conn.cancel()
+
+    def pool_key(self):
+        """
+        Key of node connection in pool of open connections
+
+        :return: Connection key
+        """
+        return self.conn_args['node_name'], self.conn_args.get('user')
 
     def close(self):
         """
         Close SSH connection
         """
-        if (self.conn is not None) and self.connected:
+        if (self.conn is not None) and self.connected and (self.pool is not None):
+            self.pool.release(self.pool_key(), self.conn)  # keep connection open for next operations
+            self.connected = False
+
+        elif (self.conn is not None) and self.connected:
             self.conn.close()
+            self.connected = False
 
             if self.trace_fun:
                 self.trace_fun(CONN_CLOSED.format(self.conn_args['node_name']))
 
+    def shutdown(self):
+        """
+        Release resources kept by node between operations (called when connection is closed)
+        """
+        return None
+
 
 # List of nodes
 Nodes = [Node]
@@ -314,28 +597,42 @@ class NodeGroup:
     """
 
     def __init__(self, trace_fun: TracingFun, name: str, ng_type: str, nodes: Nodes, sources: Sources,
-                 patterns: Patterns):
+                 patterns: Patterns, max_parallel: int = 0, pool: Optional[ConnPool] = None,
+                 chunk_size: int = CHUNK_SIZE):
         """
         Class constructor
 
         :param trace_fun: Callback tracing function
         :param name: External name of node group
-        :param ng_type: Type of nodegroup ('file', 'database')
+        :param ng_type: Type of nodegroup ('file', 'local', 'database')
         :param nodes: Nodes in node group
         :param sources: Sources
         :param patterns: Regex patterns used to sort and present message data
+        :param max_parallel: Max count of nodes processed at once, 0 - all nodes at once
+        :param pool: Pool of open connections, None - connect/close nodes on each operation
+        :param chunk_size: Count of output records passed through the search pipeline at once
         """
         self.trace_fun = trace_fun
+        self.progress_fun: Optional[ProgressFun] = None  # callback progress function, assigned by connection
 
         self.name = name
         self.type = ng_type
         self.nodes = nodes
         self.sources = sources
         self.patterns = patterns
+        self.max_parallel = max_parallel
+        self.chunk_size = chunk_size
+
+        self.pool = pool
+        for node in self.nodes:
+            node.pool = pool
 
         self.p_sort = None  # compiled sorting regex
         self.is_sort_active = False  # is sorting active
 
+        self.cancelled = threading.Event()  # is running operation cancelled? (new event for each operation)
+        self.executor: Optional[ThreadPoolExecutor] = None  # node workers of the last operation
+
     def get_node_names(self) -> [str]:
         """
         Get names of all nodes
@@ -376,16 +673,170 @@ class NodeGroup:
         src_lst = [src for src in self.sources if src.name == source_name]
         return src_lst[0]
 
-    def sort_fun(self, line: str) -> str:
+    def sort_fun(self, line: LogRecord) -> str:
         """
         Extract sorting key from 'line'
 
-        :param line:
+        :param line: Output record
         :return: sorting key
         """
-        return line  # by default sorting by whole line
+        return str(line)  # by default sorting by whole line
+
+    def stream_node(self, node: Node, node_fun, out_queue: queue.Queue, stopped: threading.Event):
+        """
+        Connect to node, run 'node_fun' on it, pass its output to 'out_queue' by chunks and close connection.
+        Completion of node is signalled by item (node, None, status), status - (is connected, can_sort, count)
+
+        :param node: Node
+        :param node_fun: Function (node) -> output iterator
+        :param out_queue: Queue of (node, chunk of output, None) items
+        :param stopped: Event, set if consumer does not accept output anymore
+        """
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    out_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        n_lines = 0
+        is_connected = False
+        try:
+            is_connected = node.connect()
+            if is_connected:
+                try:
+                    out = node_fun(node)
+                    chunk = []
+                    for line in out:
+                        chunk.append(line)
+                        if len(chunk) >= self.chunk_size:
+                            n_lines += len(chunk)
+                            if not put((node, chunk, None)):
+                                break
+                            chunk = []
+                    else:
+                        if chunk:
+                            n_lines += len(chunk)
+                            put((node, chunk, None))
+                    out.close()
+                finally:
+                    node.close()
+        finally:
+            put((node, None, (is_connected, node.can_sort, n_lines)))
+
+    def run_on_nodes_iter(self, node_fun) -> Iterator[[str]]:
+        """
+        Run 'node_fun' on all nodes concurrently (at most 'max_parallel' nodes at once),
+        output is passed by chunks as soon as nodes produce it (or sorted, if sorting is active)
+
+        :param node_fun: Function (node) -> output iterator
+        :return: Iterator of output chunks (lists of str)
+        """
+        n_workers = len(self.nodes)
+        if 0 < self.max_parallel < n_workers:
+            n_workers = self.max_parallel
+
+        n_lines = 0
+        self.wait_nodes()  # node workers of cancelled operation may still use nodes
+        cancelled = self.cancelled = threading.Event()  # cancel of this operation only
+        if n_workers > 0:
+            out_queue = queue.Queue(maxsize=CHUNK_QUEUE_SIZE)
+            stopped = threading.Event()
+            executor = self.executor = ThreadPoolExecutor(max_workers=n_workers)
+            try:
+                for node in self.nodes:
+                    executor.submit(self.stream_node, node, node_fun, out_queue, stopped)
+
+                merge_engine = merge.MergeEngine(self.sort_fun)  # output collected for sorting
+                n_active_nodes = 0
+                can_sort_all = True
+                n_completed = 0
+                while n_completed < len(self.nodes) and not cancelled.is_set():
+                    try:
+                        node, chunk, status = out_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if chunk is None:  # node completed
+                        n_completed += 1
+                        is_connected, can_sort, n_node_lines = status
+                        if is_connected:
+                            n_active_nodes += 1
+                            can_sort_all &= can_sort
+                            if self.trace_fun:
+                                self.trace_fun(INFO_NODE_COMPLETED.format(node.name, n_node_lines))
+                    elif self.is_sort_active:
+                        merge_engine.add(node.name, chunk)  # sorting keys are computed while nodes work
+                    else:
+                        n_lines += len(chunk)
+                        yield chunk
+
+                    if self.progress_fun:
+                        self.progress_fun(n_completed, len(self.nodes), n_lines + merge_engine.count)
+
+                if merge_engine.count > 0 and not cancelled.is_set():
+                    if (n_active_nodes > 0) and can_sort_all:
+                        records = merge_engine.merge()
+                    else:
+                        records = merge_engine.unsorted()
+
+                    chunk = []
+                    for record in records:
+                        chunk.append(record)
+                        if len(chunk) >= self.chunk_size:
+                            n_lines += len(chunk)
+                            yield chunk
+                            chunk = []
+                    if chunk:
+                        n_lines += len(chunk)
+                        yield chunk
+            finally:
+                stopped.set()  # release node workers if consumer has stopped
+                executor.shutdown(wait=False)
+
+        if self.trace_fun:
+            if cancelled.is_set():
+                self.trace_fun(INFO_OPERATION_CANCELLED.format(n_lines), True)
+            else:
+                self.trace_fun(INFO_OPERATION_COMPLETED.format(n_lines))
+
+    def wait_nodes(self):
+        """
+        Wait for node workers of the last operation: consumer of cancelled operation does not wait for them,
+        they stop and close node connections later
+        """
+        executor = self.executor
+        if executor is not None:
+            executor.shutdown(wait=True)
+            self.executor = None
+
+    def run_on_nodes(self, node_fun) -> [str]:
+        """
+        Run 'node_fun' on all nodes concurrently, merge and sort the output
+
+        :param node_fun: Function (node) -> output iterator
+        :return: Merged output of all nodes
+        """
+        res_lst = []
+        for chunk in self.run_on_nodes_iter(node_fun):
+            res_lst.extend(chunk)
+        return res_lst
+
+    def exec_cmd_iter(self, source_name: str, cmd: str) -> Iterator[[LogRecord]]:
+        """
+        Execute command, output is produced by chunks
 
-    def exec_cmd(self, source_name: str, cmd: str) -> [str]:
+        :param source_name: Source name
+        :param cmd: Command
+        :return: Iterator of command output chunks
+        """
+        source = self.get_source(source_name)
+
+        return self.run_on_nodes_iter(lambda node: node.exec_cmd_iter(source, cmd))
+
+    def exec_cmd(self, source_name: str, cmd: str) -> [LogRecord]:
         """
         Execute command
 
@@ -395,26 +846,25 @@ class NodeGroup:
         """
         source = self.get_source(source_name)
 
-        res_lst = []
-        n_active_nodes = 1
-        can_sort_all = True
-        for node in self.nodes:
-            is_connected = node.connect()
-            if is_connected:
-                n_active_nodes += 1
-                lst, can_sort = node.exec_cmd(node.name, source, cmd)
-                can_sort_all &= can_sort
-                res_lst.extend(lst)
-                node.close()
+        return self.run_on_nodes(lambda node: node.exec_cmd_iter(source, cmd))
 
-        if self.is_sort_active and (n_active_nodes > 0) and can_sort_all:
-            res_lst = sorted(res_lst, key=self.sort_fun)
+    def search_iter(self, source_name: str, search_str: str, search_date: str) -> Iterator[[LogRecord]]:
+        """
+        Search, output is produced by chunks
 
+        :param source_name: Source name
+        :param search_str: Search string
+        :param search_date: Search date
+        :return: Iterator of search output chunks
+        """
         if self.trace_fun:
-            self.trace_fun(INFO_OPERATION_COMPLETED.format(len(res_lst)))
-        return res_lst
+            self.trace_fun(INFO_SEARCH.format(search_str, source_name, search_date))
+
+        source = self.get_source(source_name)
+
+        return self.run_on_nodes_iter(lambda node: node.search_iter(source, search_str, search_date))
 
-    def search(self, source_name: str, search_str: str, search_date: str) -> [str]:
+    def search(self, source_name: str, search_str: str, search_date: str) -> [LogRecord]:
         """
         Search
 
@@ -423,29 +873,53 @@ class NodeGroup:
         :param search_date: Search date
         :return: Search output
         """
-        if self.trace_fun:
-            self.trace_fun(INFO_SEARCH.format(search_str, source_name, search_date))
+        res_lst = []
+        for chunk in self.search_iter(source_name, search_str, search_date):
+            res_lst.extend(chunk)
+        return res_lst
 
+    def follow_start(self, source_name: str):
+        """
+        Start follow mode: remember current end of source on all nodes
+
+        :param source_name: Source name
+        """
         source = self.get_source(source_name)
 
-        res_lst = []
-        n_active_nodes = 1
-        can_sort_all = True
-        for node in self.nodes:
-            is_connected = node.connect()
-            if is_connected:
-                n_active_nodes += 1
-                lst, can_sort = node.search(source, search_str, search_date)
-                can_sort_all &= can_sort
-                res_lst.extend(lst)
-                node.close()
+        self.run_on_nodes(lambda node: node.follow_start_iter(source))
 
-        if self.is_sort_active and (n_active_nodes > 0) and can_sort_all:
-            res_lst = sorted(res_lst, key=self.sort_fun)
+    def follow_iter(self, source_name: str, search_str: str) -> Iterator[[LogRecord]]:
+        """
+        Search in data added to source since the previous search (follow mode), output is produced by chunks
 
+        :param source_name: Source name
+        :param search_str: Search string
+        :return: Iterator of search output chunks
+        """
         if self.trace_fun:
-            self.trace_fun(INFO_OPERATION_COMPLETED.format(len(res_lst)))
-        return res_lst
+            self.trace_fun(INFO_FOLLOW.format(search_str, source_name))
+
+        source = self.get_source(source_name)
+
+        return self.run_on_nodes_iter(lambda node: node.follow_iter(source, search_str))
+
+    def cancel(self):
+        """
+        Cancel running operation on all nodes (called from other thread)
+        """
+        self.cancelled.set()
+        for node in self.nodes:
+            node.cancel()
+
+    def close(self):
+        """
+        Close open connections of nodegroup
+        """
+        self.wait_nodes()
+        if self.pool is not None:
+            self.pool.close_all()
+        for node in self.nodes:
+            node.shutdown()
 
 
 # List of NodeGroups
@@ -457,12 +931,13 @@ class Connection:
     Source connection
     """
 
-    def __init__(self, conf_filename: str, trace_fun: TracingFun = None):
+    def __init__(self, conf_filename: str, trace_fun: TracingFun = None, progress_fun: ProgressFun = None):
         """
         Class constructor
 
         :param conf_filename: Configuration file name (*.config.xml)
         :param trace_fun: Callback tracing function
+        :param progress_fun: Callback progress function
         """
         self.conf_filename = conf_filename
         self.trace_fun = trace_fun
@@ -474,6 +949,9 @@ class Connection:
             tree = et.parse(conf_filename)
             self.parse_xml_config(tree)
 
+            for nodegroup in self.nodegroups:
+                nodegroup.progress_fun = progress_fun
+
         except Exception as ex:
             if self.trace_fun:
                 self.trace_fun(CONF_READ_ERR.format(conf_filename) + ", ".join([str(arg) for arg in ex.args]))
@@ -510,7 +988,7 @@ class Connection:
                 res = ng
         return res
 
-    def exec_cmd(self, ng_index: int, source_name: str, cmd: str) -> [str]:
+    def exec_cmd(self, ng_index: int, source_name: str, cmd: str) -> [LogRecord]:
         """
         Execute command
 
@@ -522,7 +1000,19 @@ class Connection:
         nodegroup = self.nodegroups[ng_index]
         return nodegroup.exec_cmd(source_name, cmd)
 
-    def search(self, ng_index: int, source_name: str, search_str: str, search_date: str) -> [str]:
+    def exec_cmd_iter(self, ng_index: int, source_name: str, cmd: str) -> Iterator[[LogRecord]]:
+        """
+        Execute command, output is produced by chunks
+
+        :param ng_index: Index of active nodegroup
+        :param source_name: Source name
+        :param cmd: Command
+        :return: Iterator of command output chunks
+        """
+        nodegroup = self.nodegroups[ng_index]
+        return nodegroup.exec_cmd_iter(source_name, cmd)
+
+    def search(self, ng_index: int, source_name: str, search_str: str, search_date: str) -> [LogRecord]:
         """
         Search
 
@@ -534,3 +1024,54 @@ class Connection:
         """
         nodegroup = self.nodegroups[ng_index]
         return nodegroup.search(source_name, search_str, search_date)
+
+    def search_iter(self, ng_index: int, source_name: str, search_str: str, search_date: str) -> Iterator[[LogRecord]]:
+        """
+        Search, output is produced by chunks
+
+        :param ng_index: ng_index: Index of active nodegroup
+        :param source_name: Source name
+        :param search_str: Search string
+        :param search_date: Search date
+        :return: Iterator of search output chunks
+        """
+        nodegroup = self.nodegroups[ng_index]
+        return nodegroup.search_iter(source_name, search_str, search_date)
+
+    def follow_start(self, ng_index: int, source_name: str):
+        """
+        Start follow mode: remember current end of source
+
+        :param ng_index: Index of active nodegroup
+        :param source_name: Source name
+        """
+        nodegroup = self.nodegroups[ng_index]
+        nodegroup.follow_start(source_name)
+
+    def follow_iter(self, ng_index: int, source_name: str, search_str: str) -> Iterator[[LogRecord]]:
+        """
+        Search in data added to source since the previous search (follow mode), output is produced by chunks
+
+        :param ng_index: Index of active nodegroup
+        :param source_name: Source name
+        :param search_str: Search string
+        :return: Iterator of search output chunks
+        """
+        nodegroup = self.nodegroups[ng_index]
+        return nodegroup.follow_iter(source_name, search_str)
+
+    def cancel(self, ng_index: int):
+        """
+        Cancel running operation (called from other thread)
+
+        :param ng_index: Index of active nodegroup
+        """
+        nodegroup = self.nodegroups[ng_index]
+        nodegroup.cancel()
+
+    def close(self):
+        """
+        Close open connections of all nodegroups
+        """
+        for nodegroup in self.nodegroups:
+            nodegroup.close()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         keyindex.py
+# Purpose:      Inverted index of key xml tag values (correlationId etc.) to message positions
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import sys
+
+import xmlfields
+
+
+class KeyIndex:
+    """
+    Inverted index: tag -> tag value -> indexes of output lines containing it.
+    Built while result is loaded, so looking up messages with the same key value does not scan the output
+    """
+
+    def __init__(self, tags: [str], scanner: xmlfields.XmlTagScanner = None):
+        """
+        Class constructor
+
+        :param tags: Indexed tag names
+        :param scanner: Scanner of indexed tags (shared by index parts), None - create new one
+        """
+        self.tags = list(tags)
+        self.scanner = scanner if scanner is not None else xmlfields.XmlTagScanner(self.tags)
+
+        self.positions = {tag: {} for tag in self.tags}  # tag -> value -> [line index]
+        self.values = {}  # line index -> {tag: value}
+
+    def is_indexed(self, tag: str) -> bool:
+        """
+        Is tag indexed?
+        """
+        return tag in self.positions
+
+    def add(self, line_index: int, line: str):
+        """
+        Index output line
+
+        :param line_index: Index of line in output
+        :param line: Line text
+        """
+        found = self.scanner.scan(line)
+        if not found:
+            return
+
+        values = {}
+        for tag, value in found.items():
+            value = sys.intern(value.strip())
+            if value:
+                values[tag] = value
+                self.positions[tag].setdefault(value, []).append(line_index)
+        if values:
+            self.values[line_index] = values
+
+    def extend(self, index):
+        """
+        Append index of following lines
+
+        :param index: KeyIndex of the same tags
+        """
+        for tag, positions in index.positions.items():
+            own = self.positions[tag]
+            for value, lines in positions.items():
+                own.setdefault(value, []).extend(lines)
+        self.values.update(index.values)
+
+    def get_value(self, line_index: int, tag: str) -> str:
+        """
+        Get tag value of output line
+
+        :param line_index: Index of line in output
+        :param tag: Tag name
+        :return: Tag value, "" - tag is not found
+        """
+        return self.values.get(line_index, {}).get(tag, "")
+
+    def find(self, tag: str, value: str) -> [int]:
+        """
+        Get output lines with tag value
+
+        :param tag: Tag name
+        :param value: Tag value
+        :return: Indexes of lines in output order
+        """
+        return self.positions[tag].get(value, [])
+
+
+def index_keys(index: KeyIndex, text_lst: [str], first_index: int) -> KeyIndex:
+    """
+    Index key tags of lines (may be called outside of GUI thread)
+
+    :param index: Index whose tags are indexed
+    :param text_lst: Text lines
+    :param first_index: Index of first line in whole output
+    :return: Index of lines, to be appended to 'index' by KeyIndex.extend
+    """
+    part = KeyIndex(index.tags, index.scanner)
+    for i, line in enumerate(text_lst, first_index):
+        part.add(i, line)
+
+    return part
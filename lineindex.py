@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         lineindex.py
+# Purpose:      Index of line number -> byte offset checkpoints of remote files
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import threading
+from array import array
+from bisect import bisect_right
+
+# Distance (in lines) between checkpoints
+CHECKPOINT_STEP = 10000
+# Count of bytes at the file start compared by checksum: file rewritten from the start (copytruncate rotation)
+# is detected even if it has grown back past its old size. Smaller files have no checkpoints except the first line
+HEAD_SIZE = 4096
+
+
+class FileStamp():
+    """
+    State of remote file used to validate its index
+    """
+
+    def __init__(self, inode: int, mtime: int, size: int, head_sum: int = 0):
+        """
+        Class constructor
+
+        :param inode: Inode number
+        :param mtime: Modification time (sec.)
+        :param size: Size, bytes
+        :param head_sum: Checksum of the first HEAD_SIZE bytes
+        """
+        self.inode = inode
+        self.mtime = mtime
+        self.size = size
+        self.head_sum = head_sum
+
+    def is_same_lines(self, stamp) -> bool:
+        """
+        Are lines indexed by 'stamp' state still valid: file is not changed or only appended
+        (file is not truncated, its start is the same)?
+
+        :param stamp: Previous state of file
+        """
+        if self.inode != stamp.inode:
+            return False
+        if self.mtime == stamp.mtime and self.size == stamp.size:
+            return True
+        return self.size >= stamp.size and (stamp.size < HEAD_SIZE or self.head_sum == stamp.head_sum)
+
+
+class FileLineIndex():
+    """
+    Checkpoints of file: line number -> byte offset of the line start, built lazily (as far as lines are requested)
+    """
+
+    def __init__(self, stamp: FileStamp):
+        """
+        Class constructor
+
+        :param stamp: State of file the index is built for
+        """
+        self.stamp = stamp
+        self.lines = array('q', [1])  # line numbers of checkpoints, ascending
+        self.offsets = array('q', [0])  # byte offsets of checkpoints
+
+    def add(self, line: int, offset: int):
+        """
+        Add checkpoint (checkpoints that are already known are ignored)
+
+        :param line: Line number
+        :param offset: Byte offset of the line start
+        """
+        if line > self.lines[-1]:
+            self.lines.append(line)
+            self.offsets.append(offset)
+
+    def floor(self, line: int) -> [int, int]:
+        """
+        Get nearest checkpoint at or before the line
+
+        :param line: Line number
+        :return: Line number, byte offset of checkpoint
+        """
+        i = max(bisect_right(self.lines, line) - 1, 0)
+        return self.lines[i], self.offsets[i]
+
+    def last(self) -> [int, int]:
+        """
+        Get last known checkpoint
+
+        :return: Line number, byte offset of checkpoint
+        """
+        return self.lines[-1], self.offsets[-1]
+
+
+class LineIndexCache():
+    """
+    Indexes of remote files by (node, file), shared by node threads
+    """
+
+    def __init__(self):
+        """
+        Class constructor
+        """
+        self.lock = threading.Lock()
+        self.items = {}  # (node key, file name) -> FileLineIndex
+
+    def get(self, key, stamp: FileStamp) -> FileLineIndex:
+        """
+        Get index of file, new (empty) index if file is not indexed yet or is changed (not only appended)
+
+        :param key: Node, file key
+        :param stamp: Current state of file
+        :return: Index of file
+        """
+        with self.lock:
+            index = self.items.get(key)
+            if index is None or not stamp.is_same_lines(index.stamp):
+                index = FileLineIndex(stamp)
+                self.items[key] = index
+            else:
+                index.stamp = stamp
+            return index
+
+
+# Cache shared by all nodes
+line_index_cache = LineIndexCache()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         localscan.py
+# Purpose:      Built-in search of log records (source mode="block") in local or mounted files:
+#               files are memory-mapped, split into record-aligned chunks, chunks are scanned by pool of processes
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import re
+import time
+import mmap
+import fnmatch
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Approx. size of chunk scanned by one process, bytes (chunks are aligned to record start)
+SCAN_CHUNK_SIZE = 8 * 1024 * 1024
+# Count of processes of scan pool, 0 - count of CPUs
+SCAN_WORKERS = 0
+# Max count of chunks scanned at once per search (results are passed in order of chunks)
+SCAN_WINDOW = 16
+
+# date-time header at the line start (record start), as in BLOCK_SEARCH_AWK
+P_HEADER = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}", re.MULTILINE)
+# Length of date-time header
+HEADER_LEN = 23
+
+_pool = None  # pool of processes shared by local nodes, created by the first search
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers: int = SCAN_WORKERS) -> ProcessPoolExecutor:
+    """
+    Get scan pool, the pool is created once
+
+    :param workers: Count of processes, 0 - count of CPUs
+    :return: Pool of processes
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(workers or None)
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Stop processes of scan pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def list_files(local_dir: str, source_name: str, search_date: str) -> [str]:
+    """
+    Get files of source, the same as 'find . -maxdepth 1 -type f -name {source_name} -newermt {search_date}'
+
+    :param local_dir: Directory of files
+    :param source_name: File name mask
+    :param search_date: Search date in format "YYYY-MM-DD", files modified after it are searched, '' - all files
+                        (time part of date is not used: older records are skipped by scan)
+    :return: File names relative to directory ('./server.log'), sorted
+    """
+    newer = time.mktime(time.strptime(search_date[:10], '%Y-%m-%d')) if search_date else None
+    files = []
+    with os.scandir(local_dir) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and fnmatch.fnmatchcase(entry.name, source_name) and \
+                    (newer is None or entry.stat(follow_symlinks=False).st_mtime > newer):
+                files.append('./' + entry.name)
+    return sorted(files)
+
+
+def split_chunks(mm, chunk_size: int = SCAN_CHUNK_SIZE) -> [[int, int]]:
+    """
+    Split mapped file into chunks started by date-time header (the first chunk starts at the file start)
+
+    :param mm: Mapped file
+    :param chunk_size: Approx. size of chunk, bytes
+    :return: List of [start, end] byte offsets
+    """
+    bounds = [0]
+    size = len(mm)
+    pos = chunk_size
+    while pos < size:
+        m = P_HEADER.search(mm, pos)  # '^' matches only after new line, so chunk starts at the line start
+        if m is None:
+            break
+        bounds.append(m.start())
+        pos = m.start() + chunk_size
+    bounds.append(size)
+    return [[bounds[i], bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+def scan_chunk(file_path: str, start: int, end: int, search_str: bytes, search_date: bytes) -> [int, list]:
+    """
+    Search in chunk of file (runs in process of scan pool): lines are grouped into records started by date-time
+    header, records containing search string with date >= search date are found
+
+    :param file_path: File path
+    :param start: Byte offset of chunk start
+    :param end: Byte offset of chunk end
+    :param search_str: Search string, utf-8
+    :param search_date: Search date, utf-8, b'' - any date
+    :return: Count of lines in chunk, found records as [number of header line in chunk (from 0), text]
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+
+    found = []
+    line, pos = 0, 0  # count of lines before 'pos'
+    starts = [m.start() for m in P_HEADER.finditer(data)]
+    for i, rec_start in enumerate(starts):
+        rec_end = starts[i + 1] if i + 1 < len(starts) else len(data)
+        if data.find(search_str, rec_start, rec_end) >= 0 and data[rec_start:rec_start + HEADER_LEN] >= search_date:
+            line += data.count(b'\n', pos, rec_start)
+            pos = rec_start
+            found.append([line, data[rec_start:rec_end].decode('utf-8', 'replace')])
+    return line + data.count(b'\n', pos), found
+
+
+def record_lines(file_name: str, line_number: int, text: str):
+    """
+    Convert found record to output lines of built-in search: header line is prefixed by 'file:line:'
+
+    :param file_name: File name
+    :param line_number: Number of header line in file
+    :param text: Record text
+    :return: Output lines iterator
+    """
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    yield '{0}:{1}:{2}\n'.format(file_name, line_number, lines[0])
+    for line in lines[1:]:
+        yield line + '\n'
+
+
+def search_iter(local_dir: str, source_name: str, search_str: str, search_date: str, is_cancelled=None,
+                chunk_size: int = SCAN_CHUNK_SIZE, workers: int = SCAN_WORKERS):
+    """
+    Search in files of source: chunks of all files are scanned in parallel, output is passed in order of files
+    and lines. A single chunk is scanned without the pool
+
+    :param local_dir: Directory of files
+    :param source_name: File name mask
+    :param search_str: Search string
+    :param search_date: Search date in format "YYYY-MM-DD", files and records with date >= search_date are searched
+    :param is_cancelled: Function returning True if search is cancelled, None - search is not cancelled
+    :param chunk_size: Approx. size of chunk, bytes
+    :param workers: Count of processes of scan pool, 0 - count of CPUs
+    :return: Output lines iterator, header lines of records are prefixed by 'file:line:' as grep -Hn does
+    """
+    tasks = []  # [file name, file path, start, end]
+    for file_name in list_files(local_dir, source_name, search_date):
+        file_path = os.path.join(local_dir, file_name)
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # empty file can't be mapped
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                tasks.extend([file_name, file_path, start, end] for start, end in split_chunks(mm, chunk_size))
+
+    args = (search_str.encode('utf-8'), (search_date or '').encode('utf-8'))
+    if len(tasks) == 1:
+        file_name, file_path, start, end = tasks[0]
+        _, found = scan_chunk(file_path, start, end, *args)
+        for line, text in found:
+            yield from record_lines(file_name, line + 1, text)
+        return
+
+    pool = get_pool(workers)
+    pending = deque()  # [file name, future] in order of chunks, next chunks are scanned meanwhile
+    bases = {}  # file name -> count of lines in passed chunks
+
+    def chunk_lines(file_name, future):
+        n_lines, found = future.result()
+        base = bases.get(file_name, 0)
+        for line, text in found:
+            yield from record_lines(file_name, base + line + 1, text)
+        bases[file_name] = base + n_lines
+
+    try:
+        for file_name, file_path, start, end in tasks:
+            pending.append([file_name, pool.submit(scan_chunk, file_path, start, end, *args)])
+            if len(pending) >= SCAN_WINDOW:
+                if is_cancelled is not None and is_cancelled():
+                    return
+                yield from chunk_lines(*pending.popleft())
+
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                return
+            yield from chunk_lines(*pending.popleft())
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -11,22 +11,43 @@
 # Created:      2019-01-16
 # ----------------------------------------------------------------------------
 
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:  # command line search without GUI: see logcli.py
+    import logcli
+    sys.exit(logcli.main())
+
 import wx
 import wx.aui as aui
 
-import re
 from datetime import datetime
-from yattag import indent
 from lxml import etree as et
 
+import keyindex
 import loganalyzer_gui
 import logconn
 import logxmlstc
 import msglist
+import worker
+from regexes import registry
+from msgcache import indent_cache
 
 # Max count of elements in search history
 MAX_SEARCH_HISTORY = 15
 
+# Labels of 'Search' button
+BTN_SEARCH = u"Search"
+BTN_CANCEL = u"Cancel"
+
+# Search progress: count of completed nodes, count of nodes, count of lines
+INFO_PROGRESS = u"{0}/{1} node(s), {2} line(s)"
+
+# Label of 'Follow' checkbox
+CB_FOLLOW = u"Follow"
+
+# Interval (ms) between searches of appended data in follow mode
+FOLLOW_INTERVAL = 10000
+
 
 class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
     """
@@ -34,8 +55,10 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
     """
 
     # self.conn: logconn.LogConnection - Connection to log sources
-    # self.text_lst: [str] - Text extracted from source
+    # self.text_lst: [logrecord.LogRecord] - Records extracted from source (lines of file part)
     # self.text_lst_shown: [str] - Processed text, shown in GUI
+    # self.key_index: keyindex.KeyIndex - Index of key tag values of self.text_lst_shown
+    # self.follow_args: (int, str, str) - Nodegroup index, source name, search string of followed search, or None
 
     def __init__(self, parent):
         """
@@ -56,12 +79,32 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
 
         self.adjust_nb_tab_close_flag()
 
+        # Dynamically create search progress widgets
+        self.ga_Progress = wx.Gauge(self, wx.ID_ANY, 1, wx.DefaultPosition, wx.Size(100, -1))
+        self.lb_Progress = wx.StaticText(self, wx.ID_ANY, wx.EmptyString)
+        bsz_Controls = self.bt_Search.GetContainingSizer()
+        bsz_Controls.Add(self.ga_Progress, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 10)
+        bsz_Controls.Add(self.lb_Progress, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 5)
+
+        # Dynamically create follow mode widgets
+        self.cb_Follow = wx.CheckBox(self, wx.ID_ANY, CB_FOLLOW)
+        bsz_Controls.Insert(bsz_Controls.GetItemIndex(self.bt_Search) + 1, self.cb_Follow, 0,
+                            wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 10)
+        self.cb_Follow.Bind(wx.EVT_CHECKBOX, self.cb_Follow_OnCheckBox)
+        self.follow_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.follow_timer_OnTimer, self.follow_timer)
+        self.Layout()
+
         self.text_lst = []
         self.text_lst_shown = []
+        self.key_index = keyindex.KeyIndex([])  # index of key tags of self.text_lst_shown
+
+        self.worker = None  # background thread of running operation
+        self.follow_args = None  # followed search
 
         # Read configuration
         conf_filename = self.exec_module_name + ".config.xml"
-        self.conn = logconn.LogConnection(conf_filename, self.write_trace)
+        self.conn = logconn.LogConnection(conf_filename, self.write_trace, self.write_progress)
 
         # Setup GUI controls
         self.fill_nodegroups()
@@ -75,6 +118,10 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         """
 
         self.write_state(self.exec_module_name + ".data.xml")  # Save GUI settings
+        self.stop_follow()
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()
+        self.conn.close()  # close pooled node connections
         event.Skip()
 
     def cb_NodeGroups_OnChoice(self, event):
@@ -82,8 +129,14 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         New nodegroup selected in GUI
         """
 
-        self.stc_OutLog.ClearSelections()
-        self.stc_OutLog.ClearAll()
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()  # output of running operation does not match new nodegroup
+        self.worker = None
+        self.stop_follow()
+        self.bt_Search.SetLabel(BTN_SEARCH)
+        self.bt_Search.Enable()
+
+        self.stc_OutLog.clear_output()
 
         self.nb_OutLog.SetSelection(0)  # switch to 'Log' tab in AuiNotebook
 
@@ -112,20 +165,60 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
 
     def bt_Search_OnBtnClick(self, event):
         """
-        'Search' button pressed
+        'Search' button pressed: start search or cancel running one
         """
-        try:
-            self.SetCursor(wx.Cursor(wx.CURSOR_WAIT))
-            self.bt_Search.Disable()
-            source_name = self.cb_Sources.GetStringSelection()
-            self.ch_SearchText_OnTextEnter(None)
-            search_str = self.ch_SearchText.GetValue()
-            search_date = self.selected_date()
-
-            self.do_search(source_name, search_str, search_date)
-        finally:
-            self.bt_Search.Enable()
-            self.SetCursor(wx.Cursor(wx.CURSOR_ARROW))
+        if self.worker is not None and self.worker.is_running():
+            if not self.worker.is_cancelling():
+                self.stop_follow()
+                self.worker.cancel()
+                self.bt_Search.Disable()  # enabled when operation stops
+            return
+
+        source_name = self.cb_Sources.GetStringSelection()
+        self.ch_SearchText_OnTextEnter(None)
+        search_str = self.ch_SearchText.GetValue()
+        search_date = self.selected_date()
+
+        self.do_search(source_name, search_str, search_date)
+
+    def cb_Follow_OnCheckBox(self, event):
+        """
+        'Follow' checkbox changed: unchecked - stop following the search.
+        Checked - next search is followed
+        """
+        if not self.cb_Follow.GetValue():
+            self.stop_follow()
+
+    def follow_timer_OnTimer(self, event):
+        """
+        Time to search data appended to sources since previous search (follow mode)
+        """
+        if self.follow_args is None:
+            return
+        if self.worker is not None and self.worker.is_running():
+            self.follow_timer.StartOnce(FOLLOW_INTERVAL)  # operation is still running, try later
+            return
+
+        ng_index, source_name, search_str = self.follow_args
+        n_shown = len(self.text_lst_shown)
+
+        def produce():
+            return self.conn.follow_iter(ng_index, source_name, search_str)
+
+        def process(chunk, first_index):
+            first_index += n_shown  # new lines are appended to shown ones
+            text_shown = logxmlstc.LogXmlSTC.format_output(chunk)
+            return (text_shown, self.lc_OutMsg.extract_messages(text_shown, first_index),
+                    keyindex.index_keys(self.key_index, text_shown, first_index))
+
+        self.start_worker(produce, process, self.on_search_chunk, ng_index, False)
+
+    def stop_follow(self):
+        """
+        Stop following the search
+        """
+        self.follow_args = None
+        self.follow_timer.Stop()
 
     def ch_SearchText_OnRightUp(self, event):
         """
@@ -174,6 +267,10 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         :param is_error: bool = True - is error message
         """
 
+        if not wx.IsMainThread():  # called from node worker thread
+            wx.CallAfter(self.write_trace, text, is_error)
+            return
+
         if is_error:
             self.rt_Status.BeginTextColour((255, 0, 0))
         else:
@@ -182,7 +279,24 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         self.rt_Status.WriteText(text + "\n")
 
         self.rt_Status.EndTextColour()
-        self.rt_Status.Update()
+        self.rt_Status.ShowPosition(self.rt_Status.GetLastPosition())
+
+    def write_progress(self, n_completed: int, n_nodes: int, n_lines: int):
+        """
+        Show progress of running operation
+
+        :param n_completed: Count of completed nodes
+        :param n_nodes: Count of nodes
+        :param n_lines: Count of lines found
+        """
+
+        if not wx.IsMainThread():  # called from worker thread
+            wx.CallAfter(self.write_progress, n_completed, n_nodes, n_lines)
+            return
+
+        self.ga_Progress.SetRange(max(n_nodes, 1))
+        self.ga_Progress.SetValue(n_completed)
+        self.lb_Progress.SetLabel(INFO_PROGRESS.format(n_completed, n_nodes, n_lines))
 
     def selected_nodegroup_index(self):
         """
@@ -253,7 +367,7 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         """
 
         if self.text_lst_shown and msg_index >= 0:
-            xml_line = indent(self.text_lst_shown[msg_index])  # message string
+            xml_line = indent_cache.get(self.text_lst_shown[msg_index])  # message string
 
             # Create StyledTextCtrl pane with XML syntax highlighting
 
@@ -278,16 +392,17 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         """
 
         if self.text_lst_shown and msg_index >= 0:
-            xml_line = indent(self.text_lst_shown[msg_index])
-            cor_id = MainFrame.get_tag_value(xml_line, tag)
-
-            xml_text = []
-            cnt = 0
-            for line in self.text_lst_shown:
-                if MainFrame.get_tag_value(line, tag) == cor_id:
-                    xml_line = indent(line)
-                    xml_text.append(xml_line)
-                    cnt += 1
+            if self.key_index.is_indexed(tag):
+                cor_id = self.key_index.get_value(msg_index, tag)
+                positions = self.key_index.find(tag, cor_id)
+            else:  # tag is not indexed: scan whole output
+                xml_line = indent_cache.get(self.text_lst_shown[msg_index])
+                cor_id = MainFrame.get_tag_value(xml_line, tag)
+                positions = [i for i, line in enumerate(self.text_lst_shown)
+                             if MainFrame.get_tag_value(line, tag) == cor_id]
+
+            xml_text = [indent_cache.get(self.text_lst_shown[i]) for i in positions]
+            cnt = len(xml_text)
 
             self.stc_OutLog.AppendText(''.join(xml_text))
             self.stc_OutLog.Update()
@@ -318,8 +433,7 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         :return: Tag value
         """
 
-        pattern = r"(?:.*<.*?:{0}>)(.+?)(?:<\/.*?:{0}>)(?:.*)"
-        m = re.search(pattern.format(tag), text)
+        m = registry.tag_value(tag).search(text)
         if not m:
             return ""
         else:
@@ -335,8 +449,11 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         """
 
         if self.text_lst_shown and msg_index >= 0:
-            xml_line = indent(self.text_lst_shown[msg_index])
-            tag_value = MainFrame.get_tag_value(xml_line, tag)
+            if self.key_index.is_indexed(tag):
+                tag_value = self.key_index.get_value(msg_index, tag)
+            else:
+                xml_line = indent_cache.get(self.text_lst_shown[msg_index])
+                tag_value = MainFrame.get_tag_value(xml_line, tag)
             data_o = wx.TextDataObject()
             data_o.SetText(tag_value)
             if wx.TheClipboard.IsOpened() or wx.TheClipboard.Open():
@@ -355,16 +472,20 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
         """
 
         self.rt_Status.Clear()
-        self.rt_Status.Update()
 
+        ng_index = self.selected_nodegroup_index()
         source_name = self.cb_Sources.GetStringSelection()
+        self.stop_follow()  # output is replaced by file part
 
-        self.text_lst = self.conn.get_file_part(self.selected_nodegroup_index(), source_name, file_name, num_from,
-                                                num_to)
+        def produce():
+            yield self.conn.get_file_part(ng_index, source_name, file_name, num_from, num_to)
 
-        self.text_lst_shown = self.stc_OutLog.set_output_extended(self.text_lst,
-                                                                  [self.selected_nodegroup().p_sort])
-        self.lc_OutMsg.set_output(self.text_lst_shown)
+        def process(chunk, first_index):
+            text_shown = logxmlstc.LogXmlSTC.format_output_extended(chunk)
+            return (text_shown, self.lc_OutMsg.extract_messages(text_shown, first_index),
+                    keyindex.index_keys(self.key_index, text_shown, first_index))
+
+        self.start_worker(produce, process, self.on_file_part_chunk, ng_index)
 
     def search_by_str(self, search_str):
         """
@@ -385,7 +506,9 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
     def do_search(self, source_name, search_str, search_date):
         """
         Search by data set in GUI:
-        Search in 'source_name' by 'search_str' with date >= 'search_date'
+        Search in 'source_name' by 'search_str' with date >= 'search_date'.
+        Search runs in background thread, result is shown by chunks as soon as nodes produce it.
+        If 'Follow' is checked, data appended to active log files is searched periodically after that
 
         :param source_name: Search source name
         :param search_str: Search pattern
@@ -397,12 +520,108 @@ class MainFrame(loganalyzer_gui.LogAnalyzerFrame):
             return
         search_str = search_str.strip()
         self.rt_Status.Clear()
-        self.rt_Status.Update()
 
-        self.text_lst = self.conn.search(self.selected_nodegroup_index(), source_name, search_str, search_date)
+        ng_index = self.selected_nodegroup_index()
+        self.stop_follow()
+        is_follow = self.cb_Follow.GetValue()
+
+        def produce():
+            if is_follow:
+                self.conn.follow_start(ng_index, source_name)  # remember active files state before search
+            yield from self.conn.search_iter(ng_index, source_name, search_str, search_date)
+
+        def process(chunk, first_index):
+            text_shown = logxmlstc.LogXmlSTC.format_output(chunk)
+            return (text_shown, self.lc_OutMsg.extract_messages(text_shown, first_index),
+                    keyindex.index_keys(self.key_index, text_shown, first_index))
+
+        self.start_worker(produce, process, self.on_search_chunk, ng_index)
+        if is_follow:
+            self.follow_args = (ng_index, source_name, search_str)
+
+    def start_worker(self, produce_fun, process_fun, chunk_fun, ng_index, is_clear=True):
+        """
+        Run operation in background thread, clear output widgets
+
+        :param produce_fun: Function () -> iterator of output chunks
+        :param process_fun: Function (chunk, first index) -> post-processed chunk, runs in background thread
+        :param chunk_fun: Callback (worker, chunk, post-processed chunk), runs in GUI thread
+        :param ng_index: Index of nodegroup
+        :param is_clear: Clear output widgets? False - output of operation is appended to shown one
+        """
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()  # output of previous operation is ignored
+
+        if is_clear:
+            self.text_lst = []
+            self.text_lst_shown = []
+            self.key_index = keyindex.KeyIndex(self.selected_nodegroup().patterns.key_tags)
+            self.stc_OutLog.clear_output()
+            self.lc_OutMsg.clear_output()
+        self.write_progress(0, len(self.selected_nodegroup().nodes), 0)
+
+        self.bt_Search.SetLabel(BTN_CANCEL)
+        self.bt_Search.Enable()
+        self.worker = worker.Worker(produce_fun, process_fun, chunk_fun, self.on_worker_done,
+                                    lambda: self.conn.cancel(ng_index))
+        self.worker.start()
+
+    def on_search_chunk(self, sender, chunk, processed):
+        """
+        Next chunk of search result is ready (GUI thread)
+
+        :param sender: Worker
+        :param chunk: Chunk of search result
+        :param processed: Formatted text, table of messages, index of key tags
+        """
+        if sender is not self.worker:  # output of cancelled operation
+            return
+
+        text_shown, messages, key_index = processed
+        self.text_lst.extend(chunk)
+        self.text_lst_shown.extend(text_shown)
+        self.key_index.extend(key_index)
+        self.stc_OutLog.append_text(text_shown, [self.selected_nodegroup().p_sort], chunk)
+        self.lc_OutMsg.append_messages(text_shown, messages)
+
+    def on_file_part_chunk(self, sender, chunk, processed):
+        """
+        Part of file is read (GUI thread)
+
+        :param sender: Worker
+        :param chunk: Part of file: records (LogRecord)
+        :param processed: Formatted text, table of messages, index of key tags
+        """
+        if sender is not self.worker:  # output of cancelled operation
+            return
+
+        text_shown, messages, key_index = processed
+        self.text_lst = chunk
+        self.text_lst_shown = text_shown
+        self.key_index.extend(key_index)
+        self.stc_OutLog.set_text_extended(text_shown, [self.selected_nodegroup().p_sort], chunk)
+        self.lc_OutMsg.append_messages(text_shown, messages)
+
+    def on_worker_done(self, sender, is_cancelled, error):
+        """
+        Background operation completed (GUI thread)
+
+        :param sender: Worker
+        :param is_cancelled: Was operation cancelled?
+        :param error: Exception raised by operation, or None
+        """
+        if error is not None:
+            self.write_trace(", ".join([str(arg) for arg in error.args]), True)
+
+        if sender is self.worker:
+            self.bt_Search.SetLabel(BTN_SEARCH)
+            self.bt_Search.Enable()
 
-        self.text_lst_shown = self.stc_OutLog.set_output(self.text_lst, [self.selected_nodegroup().p_sort])
-        self.lc_OutMsg.set_output(self.text_lst_shown)
+            if self.follow_args is not None:
+                if is_cancelled or error is not None:
+                    self.stop_follow()
+                else:
+                    self.follow_timer.StartOnce(FOLLOW_INTERVAL)  # search appended data later
 
     def read_state(self, filename: str):
         """
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         logcli.py
+# Purpose:      Command line (non-GUI) search, records are written to stdout as JSON lines
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import logconn
+
+# Default configuration file: the same as used by GUI
+CONF_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loganalyzer.config.xml")
+
+# Exit codes: search failed (configuration error, unknown nodegroup or source), interrupted
+EXIT_ERROR = 1
+EXIT_INTERRUPTED = 130
+
+ERR_NODEGROUP = "Unknown nodegroup '{0}', available: {1}"
+ERR_SOURCE = "Unknown source '{0}' in nodegroup '{1}', available: {2}"
+INFO_TIMING = "Startup {0:.0f} ms, first record {1:.0f} ms, total {2:.0f} ms, {3} record(s)"
+
+
+def write_trace(text: str, is_error: bool = False, is_verbose: bool = False):
+    """
+    Write trace message to stderr: errors always, other messages in verbose mode
+
+    :param text: Text to write
+    :param is_error: Is error message?
+    :param is_verbose: Verbose mode?
+    """
+    if is_error or is_verbose:
+        print(text, file=sys.stderr, flush=True)
+
+
+def record_json(record) -> str:
+    """
+    Convert output record to JSON line
+
+    :param record: Output record (logrecord.LogRecord)
+    :return: JSON object string
+    """
+    return json.dumps({'node': record.node, 'file': record.file, 'line': record.line_number,
+                       'timestamp': record.timestamp, 'text': record.body}, ensure_ascii=False)
+
+
+def open_connection(args) -> [logconn.LogConnection, int]:
+    """
+    Read configuration, find nodegroup
+
+    :param args: Parsed command line arguments
+    :return: Connection, index of nodegroup (None - nodegroup is not found)
+    """
+    conn = logconn.LogConnection(args.config, lambda text, is_error=False: write_trace(text, is_error, args.verbose))
+
+    names = conn.get_nodegroup_names()
+    if args.nodegroup not in names:
+        write_trace(ERR_NODEGROUP.format(args.nodegroup, ", ".join(names)), True)
+        return conn, None
+    return conn, names.index(args.nodegroup)
+
+
+def cmd_list(args) -> int:
+    """
+    'list' command: print nodegroups and their sources
+    """
+    conn = logconn.LogConnection(args.config, lambda text, is_error=False: write_trace(text, is_error, args.verbose))
+    for nodegroup in conn.nodegroups:
+        print(json.dumps({'nodegroup': nodegroup.name, 'type': nodegroup.type,
+                          'nodes': nodegroup.get_node_names(),
+                          'sources': [source.name for source in nodegroup.sources]}, ensure_ascii=False))
+    return 0
+
+
+def cmd_search(args) -> int:
+    """
+    'search' command: search in source of nodegroup, records are written as soon as nodes produce them
+    """
+    t_start = time.perf_counter()
+    conn, ng_index = open_connection(args)
+    if ng_index is None:
+        return EXIT_ERROR
+
+    source_names = [source.name for source in conn.nodegroups[ng_index].sources]
+    if args.source not in source_names:
+        write_trace(ERR_SOURCE.format(args.source, args.nodegroup, ", ".join(source_names)), True)
+        return EXIT_ERROR
+    t_ready = time.perf_counter()
+
+    t_first = None
+    n_records = 0
+    out = conn.search_iter(ng_index, args.source, args.search_str, args.since)
+    try:
+        for chunk in out:
+            if t_first is None:
+                t_first = time.perf_counter()
+            if args.limit > 0:
+                chunk = chunk[:args.limit - n_records]
+            sys.stdout.write("".join(record_json(record) + "\n" for record in chunk))
+            sys.stdout.flush()
+            n_records += len(chunk)
+            if 0 < args.limit <= n_records:
+                break  # nodes are stopped by closing the output
+
+    except BrokenPipeError:  # reader of pipeline has exited
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+    except KeyboardInterrupt:
+        conn.cancel(ng_index)
+        return EXIT_INTERRUPTED
+
+    finally:
+        out.close()
+        conn.close()
+
+    if args.timing:
+        t_end = time.perf_counter()
+        write_trace(INFO_TIMING.format((t_ready - t_start) * 1000, ((t_first or t_end) - t_start) * 1000,
+                                       (t_end - t_start) * 1000, n_records), True)
+    return 0
+
+
+def add_common_args(parser: argparse.ArgumentParser, is_command: bool = False):
+    """
+    Add options common for all commands
+
+    :param parser: Parser of command line or of command
+    :param is_command: Options of command? They have no defaults, so values given before command are kept
+    """
+    parser.add_argument('--config', default=argparse.SUPPRESS if is_command else CONF_FILENAME,
+                        help='configuration file (*.config.xml)')
+    parser.add_argument('-v', '--verbose', action='store_true', default=argparse.SUPPRESS if is_command else False,
+                        help='write trace messages to stderr')
+
+
+def parse_args(argv: [str]):
+    """
+    Parse command line
+
+    :param argv: Command line arguments
+    :return: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(prog='loganalyzer', description='Log search without GUI')
+    add_common_args(parser)
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    common = argparse.ArgumentParser(add_help=False)  # common options are accepted after command as well
+    add_common_args(common, True)
+
+    p = commands.add_parser('list', parents=[common], help='list nodegroups and sources')
+    p.set_defaults(fun=cmd_list)
+
+    p = commands.add_parser('search', parents=[common], help='search, records are written to stdout as JSON lines')
+    p.add_argument('search_str', help='search string')
+    p.add_argument('--nodegroup', required=True, help='nodegroup name')
+    p.add_argument('--source', required=True, help='source name')
+    p.add_argument('--since', default='', help="search in data with date >= since, format 'YYYY-MM-DD'")
+    p.add_argument('--limit', type=int, default=0, help='stop after count of records, 0 - no limit')
+    p.add_argument('--timing', action='store_true', help='write startup and search time to stderr')
+    p.set_defaults(fun=cmd_search)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: [str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        return args.fun(args)
+    except Exception as ex:
+        write_trace(", ".join([str(arg) for arg in ex.args]), True)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
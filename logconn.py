@@ -11,23 +11,166 @@
 # Created:      2019-01-16
 # ----------------------------------------------------------------------------
 
-import re
-import paramiko
+import os
+import io
+import socket
+import codecs
+import subprocess
+import threading
+import shlex
+import posixpath
+import zlib
+import importlib
 from yattag import indent
 from lxml import etree as et
-import cx_Oracle
 
 import conn
+import regexes
+from logrecord import LogRecord
+from msgcache import indent_cache
+from postproc import postprocessor, POSTPROC_MIN_RECORDS, POSTPROC_BATCH_SIZE, POSTPROC_WORKERS
+from lineindex import line_index_cache, FileStamp, CHECKPOINT_STEP, HEAD_SIZE
+import localscan
+from resultcache import ResultCache, RESULT_CACHE_SIZE
 
 # In-application tracing strings
 
 INFO_GET_LOG_PART = "Get lines from {} to {} from file'{}'"
 INFO_SEARCH_EXT = "Extended search for '{}' in files '{}' with date >= '{}'"
+INFO_SEARCH_LOCAL = "Scan for '{}' in local files '{}' with date >= '{}'"
+ERR_LOCAL_DIR = "Directory '{}' is not found"
+
+# Defaults of open connections pool: idle timeout, keepalive interval (sec.)
+CONN_IDLE_TIMEOUT = 300
+CONN_KEEPALIVE = 30
+
+# Size of block (bytes) read from ssh channel at once
+READ_BLOCK_SIZE = 65536
+
+# Defaults of database fetching: count of rows fetched by one round trip, count of rows prefetched by execute
+DB_ARRAY_SIZE = 100
+DB_PREFETCH_ROWS = 100
+
+# Default count of statements cached by database connection: repeated searches are soft parsed only if the session
+# is kept open between searches (session pool of node, attribute pool-max), otherwise each search opens new session
+DB_STMT_CACHE_SIZE = 20
+
+# Defaults of database session pool: min count of sessions, idle timeout (sec.)
+DB_POOL_MIN = 1
+DB_POOL_IDLE_TIMEOUT = 300
+
+# Compression of file node output: none, ssh transport compression (zlib), remote output piped through gzip
+COMPRESS_NONE = 'none'
+COMPRESS_TRANSPORT = 'transport'
+COMPRESS_GZIP = 'gzip'
+
+# Remote command with gzipped output
+GZIP_CMD = "(\n{cmd}\n) | gzip -1 -c"
+
+# Reading part of file by line numbers (get_file_part) through index of line -> byte offset checkpoints:
+# state of file (inode, mtime, size), checksum of the file start (crc, count of bytes)
+FILE_STAT_CMD = "stat -L -c '%i %Y %s' {file} && head -c {count} {file} | cksum"
+# checkpoints (line, offset) from known checkpoint up to line 'to' (offsets are counted in bytes: LC_ALL=C)
+FILE_INDEX_CMD = "tail -c +{pos} {file} | LC_ALL=C awk -v l={line} -v o={offset} -v step={step} -v to={to} " \
+                 "'{{ if ((l - 1) % step == 0) print l, o; if (l >= to) exit; o += length($0) + 1; l++ }}'"
+# lines from 'a' to the end of window, read from checkpoint, as 'file:line:text'
+FILE_PART_CMD = "tail -c +{pos} {file} | head -n {count} | awk -v l={line} -v a={num_from} -v f={file} " \
+                "'{{ if (l >= a) print f \":\" l \":\" $0; l++ }}'"
+
+# Built-in search of log records (source mode="block"), runs on remote host:
+# lines are grouped into records started by date-time header, only records containing search string
+# with date >= search date are sent, gzipped. Header line of record is prefixed by 'file:line:' as grep -Hn does.
+# Search string and date are passed by environment, so they are not interpreted by awk.
+# In follow mode part of file is read from stdin: file name, number of its first line - 1 are passed by environment
+BLOCK_SEARCH_AWK = r'''
+function flush() {
+    if (buf != "" && index(buf, s) > 0 && ts >= d)
+        printf "%s:%d:%s", fn, ln, buf
+    buf = ""
+}
+BEGIN {
+    s = ENVIRON["LA_SEARCH_STR"]; d = ENVIRON["LA_SEARCH_DATE"]
+    name = ENVIRON["LA_FILE_NAME"]; base = ENVIRON["LA_LINE_BASE"] + 0
+}
+FNR == 1 { flush() }
+/^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9],[0-9][0-9][0-9]/ {
+    flush(); fn = (name != "" ? name : FILENAME); ln = FNR + base; ts = substr($0, 1, 23); buf = $0 "\n"; next
+}
+buf != "" { buf = buf $0 "\n" }
+END { flush() }
+'''
+BLOCK_SEARCH_CMD = "LA_SEARCH_STR={search_str}; LA_SEARCH_DATE={search_date}; export LA_SEARCH_STR LA_SEARCH_DATE; " \
+                   "find . -maxdepth 1 -type f -name {source_name}{newer} -exec awk {awk} {{}} +"
+
+# Follow mode: search in data added to the active (last modified) file since the previous search.
+# files of source (newest first) with inode and size
+FOLLOW_LIST_CMD = "find . -maxdepth 1 -type f -name {source_name} -printf '%T@\\t%i\\t%s\\t%p\\n' | sort -rn"
+# count of lines in the first 'count' bytes of file
+FOLLOW_COUNT_CMD = "head -c {count} {file} | wc -l"
+# end of complete data in 'count' bytes of file from position 'pos': start of the last record (it may be continued
+# by the next data) or end of the last complete line if data has no records, as count of bytes and count of lines.
+# The rest is searched by the next search
+FOLLOW_CUT_CMD = "tail -c +{pos} {file} | head -c {count} | LC_ALL=C awk -v count={count} {awk}"
+FOLLOW_CUT_AWK = r'''
+/^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9],[0-9][0-9][0-9]/ {
+    if (o > 0) { cut = o; n_cut = NR - 1 }
+    is_rec = 1
+}
+{ o += length($0) + 1; if (o <= count) { full = o; n_full = NR } }
+END { if (is_rec) print cut + 0, n_cut + 0; else print full + 0, n_full + 0 }
+'''
+# built-in search (source mode="block") in 'count' bytes of file from position 'pos'
+FOLLOW_PART_CMD = "LA_SEARCH_STR={search_str}; LA_SEARCH_DATE=''; LA_FILE_NAME={file}; LA_LINE_BASE={base}; " \
+                  "export LA_SEARCH_STR LA_SEARCH_DATE LA_FILE_NAME LA_LINE_BASE; " \
+                  "tail -c +{pos} {file} | head -c {count} | awk {awk}"
+# search by command of source (mode="cmd") in 'count' bytes of file from position 'pos' copied to temporary directory,
+# line numbers of output 'file:line:text' are shifted by count of lines before position
+FOLLOW_SOURCE_CMD = "d=$(mktemp -d) && tail -c +{pos} {file} | head -c {count} > \"$d\"/{name} && " \
+                    "(cd \"$d\" && {cmd}) | awk -v p={prefix} -v f={file} -v base={base} {awk}; rm -rf \"$d\""
+FOLLOW_NUMBER_AWK = r'''
+index($0, p) == 1 && match(substr($0, length(p) + 1), /^[0-9]+:/) {
+    printf "%s:%d:%s\n", f, substr($0, length(p) + 1, RLENGTH - 1) + base, substr($0, length(p) + RLENGTH + 1)
+    next
+}
+{ print }
+'''
+# Search date of source command in follow mode: copied part of file is searched whatever its date is
+FOLLOW_SEARCH_DATE = '1970-01-02'
+
+# Result cache (nodegroup result-cache="1"): files searched by source with size and modification time
+FILE_LIST_CMD = "find . -maxdepth 1 -type f -name {source_name}{newer} -printf '%p\\t%s\\t%T@\\n'"
+# changed files are searched by one command, output of each file is started by marker line
+FILE_MARKER = '\x1e'
+FILE_MARKER_CMD = "printf '\\036%s\\n' {file}"
+
+# Directory of result cache: configuration file name with this extension instead of '.config.xml'
+RESULT_CACHE_DIR_EXT = '.cache'
+# Format of cached records (part of cache key, results cached in other format are not used)
+RESULT_CACHE_FORMAT = 'records-2'
 
 CONF_ERR_MISSING_TAG = "Missing configuration parameter, file: '{0}', path: '{1}', tag: '{2}'"
 CONF_ERR_MISSING_ATTR = "Missing configuration attribute, file: '{0}', path: '{1}', attribute: '{2}'"
 
 
+# Backend drivers, imported on first use: paramiko - by file nodes, cx_Oracle - by database nodes
+paramiko = None
+cx_Oracle = None
+
+
+def load_driver(name: str):
+    """
+    Import backend driver module (once), so only drivers of nodegroups present in configuration are loaded
+
+    :param name: Module name ('paramiko', 'cx_Oracle')
+    :return: Module
+    """
+    module = globals().get(name)
+    if module is None:
+        module = importlib.import_module(name)
+        globals()[name] = module
+    return module
+
+
 class ExConfErrorMissingTag(Exception):
     def __init__(self, file, path, tag):
         # Call the base class constructor with the parameters it needs
@@ -49,8 +192,10 @@ class SSHNodeConn(conn.ConnABC):
         """
         Class constructor
         """
-        self.conn = paramiko.SSHClient()
-        self.conn.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.conn = None  # ssh client, created by connect
+        self.conn_args = {}
+        self.channel = None  # channel of running command
+        self.is_cancelled = False  # was the last command cancelled?
 
     def connect(self, **conn_args):
         """
@@ -58,14 +203,39 @@ class SSHNodeConn(conn.ConnABC):
         :param conn_args: connection arguments
         :return:
         """
+        self.conn_args = conn_args
+        self.conn = SSHNodeConn.new_client()
+        is_compressed = conn_args.get('compress', COMPRESS_NONE) == COMPRESS_TRANSPORT
         if not conn_args.get('key_filename', None):
             self.conn.connect(hostname=conn_args['node_name'], username=conn_args['user'],
                               password=conn_args['password'],
-                              look_for_keys=False)
+                              look_for_keys=False, compress=is_compressed)
         else:
             pkey = paramiko.RSAKey.from_private_key_file(filename=conn_args['key_filename'],
                                                          password=conn_args['key_password'])
-            self.conn.connect(hostname=conn_args['node_name'], username=conn_args['user'], pkey=pkey)
+            self.conn.connect(hostname=conn_args['node_name'], username=conn_args['user'], pkey=pkey,
+                              compress=is_compressed)
+
+        keepalive = conn_args.get('keepalive', 0)
+        if keepalive:
+            self.conn.get_transport().set_keepalive(keepalive)
+
+    def reconnect(self):
+        """
+        Re-establish connection with the same arguments (transport is dead)
+        """
+        self.close()
+        self.connect(**self.conn_args)
+
+    @staticmethod
+    def new_client():
+        """
+        Create ssh client (paramiko is imported by the first connect)
+        """
+        load_driver('paramiko')
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        return client
 
     def exec_cmd(self, cmd) -> str:
         """
@@ -74,8 +244,80 @@ class SSHNodeConn(conn.ConnABC):
         :param cmd: command string
         :return: command output
         """
-        _, stdout, _ = self.conn.exec_command(cmd)
-        return stdout.readlines()
+        try:
+            _, stdout, _ = self.conn.exec_command(cmd)
+        except (paramiko.SSHException, EOFError, socket.error) as ex:
+            self.reconnect()  # pooled transport was dropped by server or network
+            _, stdout, _ = self.conn.exec_command(cmd)
+        self.channel = stdout.channel
+        try:
+            return stdout.readlines()
+        finally:
+            self.channel = None
+
+    def exec_cmd_iter(self, cmd, is_gzip: bool = False):
+        """
+        Execute command, output is read from channel by blocks and passed by lines
+
+        :param cmd: command string
+        :param is_gzip: Is output gzipped?
+        :return: command output iterator
+        """
+        try:
+            _, stdout, _ = self.conn.exec_command(cmd)
+        except (paramiko.SSHException, EOFError, socket.error) as ex:
+            self.reconnect()  # pooled transport was dropped by server or network
+            _, stdout, _ = self.conn.exec_command(cmd)
+
+        self.channel = stdout.channel
+        self.is_cancelled = False
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if is_gzip else None
+        tail = ''  # incomplete last line of previous block
+        try:
+            while True:
+                block = stdout.channel.recv(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                if inflater is not None:
+                    block = inflater.decompress(block)
+                lines = (tail + decoder.decode(block)).split('\n')
+                tail = lines.pop()
+                for line in lines:
+                    yield line + '\n'
+
+            if inflater is not None:
+                tail += decoder.decode(inflater.flush())
+            tail += decoder.decode(b'', True)
+            if tail:
+                yield tail
+        finally:
+            stdout.channel.close()  # stops remote command if output is not read to the end
+            self.channel = None
+
+    def cancel(self):
+        """
+        Cancel running command: close its channel
+        """
+        channel = self.channel
+        if channel is not None:
+            self.is_cancelled = True
+            channel.close()
+
+    def is_alive(self) -> bool:
+        """
+        Health check of open connection
+
+        :return: Is transport active?
+        """
+        transport = self.conn.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception as ex:
+            return False
+        return True
 
     def close(self):
         """
@@ -83,7 +325,8 @@ class SSHNodeConn(conn.ConnABC):
 
         :return:
         """
-        self.conn.close()
+        if self.conn is not None:
+            self.conn.close()
 
 
 class SSHNode(conn.Node):
@@ -92,7 +335,7 @@ class SSHNode(conn.Node):
     """
 
     def __init__(self, trace_fun: conn.TracingFun, name: str, node_name: str, user, password, remote_dir,
-                 key_filename, key_password):
+                 key_filename, key_password, keepalive: int = 0, compress: str = COMPRESS_NONE):
         """
         Class constructor
 
@@ -104,10 +347,19 @@ class SSHNode(conn.Node):
         :param remote_dir: Remote directory
         :param key_filename: Private key file name
         :param key_password: Private key password
+        :param keepalive: Interval (sec.) of keepalive packets, 0 - keepalive disabled
+        :param compress: Output compression: COMPRESS_NONE, COMPRESS_TRANSPORT - ssh transport compression,
+                         COMPRESS_GZIP - command output is gzipped on remote host
 
         """
         super().__init__(trace_fun, name, node_name=node_name, user=user, password=password, remote_dir=remote_dir,
-                         key_filename=key_filename, key_password=key_password)
+                         key_filename=key_filename, key_password=key_password, keepalive=keepalive,
+                         compress=compress)
+
+        self.result_cache: ResultCache = None  # cache of search results, assigned by nodegroup
+        self.nodegroup_name = ''
+
+        self.follow_states = {}  # follow mode: source name -> [inode, size, count of lines] of followed file
 
     def create_conn(self):
         return SSHNodeConn()
@@ -120,7 +372,390 @@ class SSHNode(conn.Node):
         :return: Output command
         """
         remote_dir = self.conn_args['remote_dir']
-        return 'cd ' + remote_dir + '\n' + cmd
+        cmd = 'cd ' + remote_dir + '\n' + cmd
+        if self.is_gzip_out(source):
+            cmd = GZIP_CMD.format(cmd=cmd)
+        return cmd
+
+    def is_gzip_out(self, source: conn.Source) -> bool:
+        """
+        Is command output gzipped? Output of sources with built-in search is always gzipped
+
+        :param source: Source
+        """
+        return source.mode == conn.SOURCE_MODE_BLOCK or self.conn_args['compress'] == COMPRESS_GZIP
+
+    def prepare_search_cmd(self, source: conn.Source, search_str: str, search_date: str) -> str:
+        """
+        Prepare search command, built-in search of log records for source mode="block"
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD", files and records with date >= search_date are searched
+        :return: Output command
+        """
+        if source.mode != conn.SOURCE_MODE_BLOCK:
+            return super().prepare_search_cmd(source, search_str, search_date)
+
+        return BLOCK_SEARCH_CMD.format(search_str=shlex.quote(search_str),
+                                       search_date=shlex.quote(search_date or ''),
+                                       source_name=shlex.quote(source.source_name),
+                                       newer=' -newermt ' + shlex.quote(search_date) if search_date else '',
+                                       awk=shlex.quote(BLOCK_SEARCH_AWK))
+
+    def search_iter(self, source: conn.Source, search_str: str, search_date: str):
+        """
+        Do search, search result is produced incrementally (through result cache if it is used by nodegroup)
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD", used if not empty for search with date >= search_date
+        :return: Search result iterator
+        """
+        if not self.is_cacheable(source):
+            yield from super().search_iter(source, search_str, search_date)
+        elif self.conn is not None:
+            yield from self.search_cached_iter(source, search_str, search_date)
+
+    def is_cacheable(self, source: conn.Source) -> bool:
+        """
+        Can search result of source be cached: search command can be run for single file?
+
+        :param source: Source
+        """
+        return self.result_cache is not None and \
+            (source.mode == conn.SOURCE_MODE_BLOCK or '{{source_name}}' in (source.expr or ''))
+
+    def search_cached_iter(self, source: conn.Source, search_str: str, search_date: str):
+        """
+        Search through result cache: results of files not changed since the previous search (rotated logs)
+        are taken from cache, only changed and new files are searched on node, all by one command.
+        Results are cached by files: result of each file is stored as soon as the file is searched
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD"
+        :return: Search result iterator
+        """
+        self.can_sort = False
+        try:
+            files = self.list_files(source, search_date)  # file name -> [size, mtime]
+            if self.conn.is_cancelled:  # file list is not complete
+                return
+
+            key = [RESULT_CACHE_FORMAT, self.nodegroup_name, self.name, source.name, search_str, search_date]
+            can_sort = True
+            changed = []
+            for file_name in sorted(files):
+                item = self.result_cache.load(key + [file_name])  # [size, mtime, can_sort, records as lists]
+                if item is not None and item[:2] == files[file_name]:
+                    can_sort = can_sort and item[2]
+                    for values in item[3]:
+                        yield LogRecord.from_list(values, self.name)
+                else:
+                    changed.append(file_name)
+
+            if changed:
+                cmd = "\n".join(FILE_MARKER_CMD.format(file=shlex.quote(file_name)) + "\n" +
+                                self.prepare_search_cmd(self.file_source(source, file_name), search_str, search_date)
+                                for file_name in changed)
+                if self.trace_fun:
+                    self.trace_fun(conn.INFO_EXEC_CMD.format(cmd))
+
+                out = self.read_out_iter(source, self.prepare_in_cmd(source, cmd))
+                for file_name, lines in SSHNode.split_files(out):
+                    records = []
+                    for record in self.prepare_out_iter(lines, source):
+                        record = self.node_record(record)
+                        records.append(record.to_list())
+                        yield record
+                    can_sort = can_sort and self.can_sort
+                    # output of cancelled command is not complete
+                    if file_name in files and not self.conn.is_cancelled:
+                        self.result_cache.save(key + [file_name], files[file_name] + [self.can_sort, records])
+
+            self.can_sort = can_sort
+
+        except Exception as ex:
+            self.can_sort = False
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
+
+    def list_files(self, source: conn.Source, search_date: str) -> dict:
+        """
+        Get files searched by source
+
+        :param source: Source
+        :param search_date: Search date in format "YYYY-MM-DD", files with date >= search_date are listed
+        :return: Dictionary file name -> [size, modification time]
+        """
+        out = self.exec_raw(source, FILE_LIST_CMD.format(
+            source_name=shlex.quote(source.source_name),
+            newer=' -newermt ' + shlex.quote(search_date) if search_date else ''))
+
+        files = {}
+        for s in out:
+            values = s.rstrip('\n').split('\t')
+            if len(values) == 3:
+                files[values[0]] = [int(values[1]), values[2]]
+        return files
+
+    @staticmethod
+    def file_source(source: conn.Source, file_name: str) -> conn.Source:
+        """
+        Get source searching single file
+
+        :param source: Source
+        :param file_name: File name
+        :return: Source with file name instead of file mask
+        """
+        return conn.Source(source.name, posixpath.basename(file_name), source.expr, source.fields, source.mode)
+
+    @staticmethod
+    def split_files(out):
+        """
+        Split output of multi-file search by marker lines
+
+        :param out: Output lines iterator
+        :return: Iterator of (file name, iterator of file output lines)
+        """
+        out = iter(out)
+        line = next(out, None)
+        while line is not None:
+            file_name = ''  # output before the first marker
+            if line.startswith(FILE_MARKER):
+                file_name = line[len(FILE_MARKER):].rstrip('\n')
+                line = next(out, None)
+
+            def lines():
+                nonlocal line
+                while line is not None and not line.startswith(FILE_MARKER):
+                    yield line
+                    line = next(out, None)
+
+            part = lines()
+            yield file_name, part
+            for _ in part:  # skip lines not read by consumer
+                pass
+
+    def list_follow_files(self, source: conn.Source) -> list:
+        """
+        Get files of source for follow mode
+
+        :param source: Source
+        :return: List of [inode, size, file name], last modified file first
+        """
+        out = self.exec_raw(source, FOLLOW_LIST_CMD.format(source_name=shlex.quote(source.source_name)))
+
+        files = []
+        for s in out:
+            values = s.rstrip('\n').split('\t')
+            if len(values) == 4:
+                files.append([int(values[1]), int(values[2]), values[3]])
+        return files
+
+    def follow_start_iter(self, source: conn.Source):
+        """
+        Remember current end of the active (last modified) file of source: start of follow mode
+
+        :param source: Source
+        :return: Empty iterator
+        """
+        self.follow_states.pop(source.name, None)
+        if self.conn is None:
+            return
+
+        try:
+            files = self.list_follow_files(source)
+            if files:
+                inode, size, file_name = files[0]
+                out = self.exec_raw(source, FOLLOW_COUNT_CMD.format(count=size, file=shlex.quote(file_name)))
+                self.follow_states[source.name] = [inode, size, int(out[0]) if out else 0]
+        except Exception as ex:
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
+
+        yield from ()
+
+    def follow_iter(self, source: conn.Source, search_str: str):
+        """
+        Search in data added to the active file since the previous search (follow mode).
+        Rotation is detected by inode: the rest of rotated file and the new active file are searched.
+        If file is truncated, it is searched from the beginning. The last record of the active file
+        (it may be continued) and its incomplete last line are left to the next search
+
+        :param source: Source
+        :param search_str: Search string
+        :return: Search result iterator
+        """
+        self.can_sort = False
+        state = self.follow_states.get(source.name)
+        if self.conn is None or state is None:
+            return
+
+        try:
+            files = self.list_follow_files(source)
+            if not files:
+                return
+            inode, offset, n_lines = state
+
+            parts = []  # [file name, position, count of bytes, count of lines before position]
+            for f_inode, f_size, file_name in files:
+                if f_inode == inode:  # followed file (may be renamed by rotation)
+                    if f_size < offset:  # truncated
+                        offset, n_lines = 0, 0
+                    parts.append([file_name, offset, f_size - offset, n_lines])
+                    break
+            active_inode, active_size, active_name = files[0]
+            if active_inode != inode:  # rotated: new active file is searched from the beginning
+                parts.append([active_name, 0, active_size, 0])
+
+            # the rest of rotated file is complete, the active file is searched up to its last record
+            active_inode = files[0][0]
+            active_part = parts[-1]
+            file_name, pos, count, base = active_part
+            n_cut = 0
+            if count > 0:
+                out = self.exec_raw(source, FOLLOW_CUT_CMD.format(pos=pos + 1, file=shlex.quote(file_name),
+                                                                  count=count, awk=shlex.quote(FOLLOW_CUT_AWK)))
+                values = out[0].split() if out else []
+                if self.conn.is_cancelled or len(values) != 2:
+                    return
+                count, n_cut = int(values[0]), int(values[1])
+                active_part[2] = count
+            state = [active_inode, pos + count, base + n_cut]
+
+            cmd = "\n".join(FILE_MARKER_CMD.format(file=shlex.quote(file_name)) + "\n" +
+                            self.prepare_follow_cmd(source, search_str, file_name, pos, count, base)
+                            for file_name, pos, count, base in parts if count > 0)
+            if not cmd:  # nothing added
+                self.follow_states[source.name] = state
+                return
+
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_CMD.format(cmd))
+
+            out = self.read_out_iter(source, self.prepare_in_cmd(source, cmd))
+            for _, lines in SSHNode.split_files(out):
+                for record in self.prepare_out_iter(lines, source):
+                    yield self.node_record(record)
+
+            if not self.conn.is_cancelled:  # otherwise the same data is searched again
+                self.follow_states[source.name] = state
+
+        except Exception as ex:
+            self.can_sort = False
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
+
+    def prepare_follow_cmd(self, source: conn.Source, search_str: str, file_name: str, pos: int, count: int,
+                           base: int) -> str:
+        """
+        Prepare search command in part of file (follow mode) with the same search as the source has:
+        built-in search of log records for source mode="block", command of source for other sources
+
+        :param source: Source
+        :param search_str: Search string
+        :param file_name: File name
+        :param pos: Byte offset of part
+        :param count: Count of bytes of part
+        :param base: Count of lines before part
+        :return: Command, output is 'file:line:text' with line numbers in the whole file
+        """
+        if source.mode == conn.SOURCE_MODE_BLOCK:
+            return FOLLOW_PART_CMD.format(search_str=shlex.quote(search_str), file=shlex.quote(file_name),
+                                          base=base, pos=pos + 1, count=count, awk=shlex.quote(BLOCK_SEARCH_AWK))
+
+        name = posixpath.basename(file_name)
+        cmd = self.prepare_search_cmd(self.file_source(source, file_name), search_str, FOLLOW_SEARCH_DATE)
+        return FOLLOW_SOURCE_CMD.format(pos=pos + 1, file=shlex.quote(file_name), count=count, name=shlex.quote(name),
+                                        cmd=cmd, prefix=shlex.quote('./' + name + ':'), base=base,
+                                        awk=shlex.quote(FOLLOW_NUMBER_AWK))
+
+    def exec_raw(self, source: conn.Source, cmd: str) -> [str]:
+        """
+        Execute auxiliary command, output is not processed
+
+        :param source: Source
+        :param cmd: Command
+        :return: Output lines
+        """
+        return list(self.read_out_iter(source, self.prepare_in_cmd(source, cmd)))
+
+    def get_file_stamp(self, source: conn.Source, file_name: str):
+        """
+        Get state of remote file
+
+        :param source: Source
+        :param file_name: File name
+        :return: FileStamp, None - file is not found
+        """
+        out = self.exec_raw(source, FILE_STAT_CMD.format(file=shlex.quote(file_name), count=HEAD_SIZE))
+        values = out[0].split() if out else []
+        if len(values) != 3:
+            return None
+        head = out[1].split() if len(out) > 1 else []
+        return FileStamp(*[int(v) for v in values], int(head[0]) if head else 0)
+
+    def get_file_part_iter(self, source: conn.Source, file_name: str, num_from: int, num_to: int):
+        """
+        Get part of file by line numbers: reading starts at the nearest checkpoint of file index
+        (index is extended up to 'num_from' if needed), lines before it are not read
+
+        :param source: Source
+        :param file_name: File name
+        :param num_from: Number of starting line
+        :param num_to: Number of ending line
+        :return: Output records iterator (see prepare_out_iter): records with file, line number of header,
+                 lines out of records as strings 'file:line:text'
+        """
+        if self.conn is None:
+            return
+
+        try:
+            stamp = self.get_file_stamp(source, file_name)
+            if stamp is None:  # file is not found on node
+                return
+
+            index = line_index_cache.get((self.pool_key(), self.conn_args['remote_dir'], file_name), stamp)
+            line, offset = index.last()
+            if line + CHECKPOINT_STEP <= num_from:  # index is not built up to the line
+                out = self.exec_raw(source, FILE_INDEX_CMD.format(pos=offset + 1, file=shlex.quote(file_name),
+                                                                  line=line, offset=offset,
+                                                                  step=CHECKPOINT_STEP, to=num_from))
+                for s in out:
+                    values = s.split()
+                    if len(values) == 2:
+                        index.add(int(values[0]), int(values[1]))
+        except Exception as ex:
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
+            return
+
+        line, offset = index.floor(num_from)
+        cmd = FILE_PART_CMD.format(pos=offset + 1, file=shlex.quote(file_name), count=num_to - line + 1,
+                                   line=line, num_from=num_from)
+        yield from self.exec_cmd_iter(SSHNode.lines_source(source), cmd)
+
+    @staticmethod
+    def lines_source(source: conn.Source) -> conn.Source:
+        """
+        Get source of command output with all lines prefixed by 'file:line:' (parts of files)
+
+        :param source: Source
+        :return: Source in mode "cmd"
+        """
+        return conn.Source(source.name, source.source_name, source.expr, source.fields, conn.SOURCE_MODE_CMD)
+
+    def read_out_iter(self, source: conn.Source, cmd: str):
+        """
+        Execute prepared command on open connection, gzipped output is inflated while it is read
+
+        :param source: Source
+        :param cmd: Prepared command
+        :return: Raw output strings iterator
+        """
+        return self.conn.exec_cmd_iter(cmd, self.is_gzip_out(source))
 
     def prepare_out_str(self, out, source: conn.Source) -> [[str], bool]:
         """
@@ -129,57 +764,89 @@ class SSHNode(conn.Node):
         :param source:
         :return:
         """
-        # date-time header, for example: 2019-01-09 09:56:18,893
-        pattern_dt = r"(^[^:]*:[0-9]*:\s*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"
-        p_dt = re.compile(pattern_dt)
-
-        # xml tag
-        pattern_xml = r".*<\/?.*?:?.+?>"
-        p_xml = re.compile(pattern_xml)
-
-        pattern_xml_soap_beg = r"(?is).*<(soap-env|soap).*>"
-        p_xml_soap_beg = re.compile(pattern_xml_soap_beg)
+        res_lst = list(self.prepare_out_iter(out, source))
+        return res_lst, self.can_sort
 
-        pattern_xml_soap_end = r"(?is).*</(soap-env|soap).*>"
-        p_xml_soap_end = re.compile(pattern_xml_soap_end)
+    def prepare_out_iter(self, out, source: conn.Source):
+        """
+        Process command output incrementally: group lines into blocks started by date-time header,
+        indent XML of blocks (large output by pool of processes, see postproc)
+        :param out: Output lines iterator
+        :param source:
+        :return: Output blocks iterator: records (LogRecord) with file, line number, date-time from header,
+                 lines out of blocks as strings
+        """
+        is_prefixed = source.mode != conn.SOURCE_MODE_BLOCK
+        for xml_str, data in postprocessor.indent_iter(self.group_out_iter(out, is_prefixed)):
+            if xml_str is None:
+                yield data
+            else:
+                yield SSHNode.make_record(data[0], xml_str, data[1])
 
-        # filename, line number header, for example: ./server.log.2019-01-09:21697:
-        pattern_pref = r"(^[^:]*:[0-9]*:\s*)(.*)"
+    def group_out_iter(self, out, is_prefixed: bool = True):
+        """
+        Group lines of command output into blocks started by date-time header
+        :param out: Output lines iterator
+        :param is_prefixed: Are all lines prefixed by 'file:line:' (grep -Hn)? False - only header lines
+                            of records are prefixed (built-in search), other lines are passed as they are in file
+        :return: Iterator of [block text, [date-time header match, block ending]],
+                 lines out of blocks as [None, line]
+        """
+        p_dt = regexes.P_DT  # date-time header, for example: 2019-01-09 09:56:18,893
+        p_xml = regexes.P_XML  # xml tag
+        p_pref = regexes.P_PREF  # filename, line number header, for example: ./server.log.2019-01-09:21697:
 
-        res_lst = []
         xml_lst = []
-        can_sort = True
+        header = None  # date-time header of block
+        self.can_sort = True
 
         for line in out:
-            if p_dt.match(line):  # line starting with date-time header?
+            m = p_dt.match(line)
+            if m:  # line starting with date-time header?
                 # output of previous line block (xml_lst)
                 if xml_lst:
-                    res_lst.append(indent("".join(xml_lst)) + "\n")
+                    yield "".join(xml_lst), [header, "\n"]
                     xml_lst = []
 
-                xml_lst.append(line)
+                header = m
+                xml_lst.append(line[m.end(1):])  # file name, line number are kept by record
             else:
                 if xml_lst:
-                    line = re.sub(pattern_pref, r'\2', line, 1)
+                    m = p_pref.match(line) if is_prefixed else None
+                    if m:
+                        line = line[m.end():]
                     if p_xml.match(line):
                         line = line.strip(' \t\n\r')
                     if line:
                         xml_lst.append(line)
 
                     """
-                    if p_xml_soap_end.match(line):
-                        res_lst.append(indent("".join(xml_lst)) + "\n")
+                    if regexes.P_XML_SOAP_END.match(line):
+                        yield indent("".join(xml_lst)) + "\n"
                         xml_lst = []
                     """
                 else:
                     if line.strip(' \t\n\r'):
-                        res_lst.append(line)
-                        can_sort = False
+                        yield None, line
+                        self.can_sort = False
 
         if xml_lst:
-            res_lst.append(indent("".join(xml_lst)))
+            yield "".join(xml_lst), [header, ""]
+
+    @staticmethod
+    def make_record(header, xml_str: str, end: str) -> LogRecord:
+        """
+        Make output record from indented block, cache indented form of the record for views
 
-        return res_lst, can_sort
+        :param header: Match of date-time header (regexes.P_DT) of the block
+        :param xml_str: Indented block without 'file:line:' header
+        :param end: Record ending
+        :return: Output record
+        """
+        record = xml_str + end
+        indent_cache.put(record, xml_str)
+        file_name, _, number = header.group(1).rstrip()[:-1].rpartition(':')
+        return LogRecord(record, file_name, int(number or 0), header.group(2))
 
 
 class SSHNodeGroup(conn.NodeGroup):
@@ -188,77 +855,365 @@ class SSHNodeGroup(conn.NodeGroup):
     """
 
     def __init__(self, trace_fun: conn.TracingFun, name: str, ng_type: str, nodes: conn.Nodes,
-                 sources: conn.Sources, patterns: conn.Patterns):
+                 sources: conn.Sources, patterns: conn.Patterns, max_parallel: int = 0,
+                 pool: conn.ConnPool = None, chunk_size: int = conn.CHUNK_SIZE, result_cache: ResultCache = None):
         """
         Class constructor
 
         :param trace_fun: Callback tracing function
         :param name: External name of node group
-        :param ng_type: Type of nodegroup ('file', 'database')
+        :param ng_type: Type of nodegroup ('file', 'local', 'database')
         :param nodes: Nodes in node group
         :param sources: Sources
         :param patterns: Regex patterns used to sort and present message data
+        :param max_parallel: Max count of nodes processed at once, 0 - all nodes at once
+        :param pool: Pool of open connections, None - connect/close nodes on each operation
+        :param chunk_size: Count of output records passed through the search pipeline at once
+        :param result_cache: Cache of search results, None - results are not cached
         """
-        super().__init__(trace_fun, name, ng_type, nodes, sources, patterns)
+        super().__init__(trace_fun, name, ng_type, nodes, sources, patterns, max_parallel, pool, chunk_size)
+
+        for node in self.nodes:
+            if isinstance(node, SSHNode):
+                node.result_cache = result_cache
+                node.nodegroup_name = name
 
         pt_sort: conn.SortPattern = self.patterns.sort
-        if pt_sort is not None:
-            if pt_sort.expr is not None:
-                self.p_sort = re.compile(pt_sort.expr)
-            else:
-                self.p_sort = None
-            self.is_sort_active = pt_sort.is_active
-        else:
-            self.p_sort = None
-            self.is_sort_active = False
+        self.p_sort = self.patterns.p_sort
+        self.is_sort_active = pt_sort.is_active if pt_sort is not None else False
+
+    def get_file_part(self, source_name: str, file_name: str, num_from: int, num_to: int) -> [str]:
+        """
+        Get part of file by line numbers from all nodes
 
-    def sort_fun(self, line):
+        :param source_name: Source name
+        :param file_name: File name
+        :param num_from: Number of starting line
+        :param num_to: Number of ending line
+        :return: Records (LogRecord), lines out of records have no file and keep 'file:line:' in text
+        """
+        source = self.get_source(source_name)
+
+        return self.run_on_nodes(lambda node: node.get_file_part_iter(source, file_name, num_from, num_to))
+
+    def sort_fun(self, line: LogRecord):
         """
         Extract datetime from message line, e.g.
-        ./server.log:132649:2018-11-02 15:26:13,349 DEBUG... -> 2018-11-02 15:26:13,349
+        ./server.log:132649:2018-11-02 15:26:13,349 DEBUG... -> 2018-11-02 15:26:13,349.
+        Date-time of record parsed from its header is used as is
 
-        :param line: input line
+        :param line: Output record
         :return: sorting key
         """
-        key = line
+        if self.p_sort is not None and line.timestamp:
+            return line.timestamp
+
+        key = str(line)
         if self.p_sort is not None:
-            m = self.p_sort.match(line)
+            m = self.p_sort.match(key)
             if m:
                 key = m.group(1)
         return key
 
 
-class SQLNodeConn(conn.ConnABC):
+class LocalNodeConn(conn.ConnABC):
     """
-    Connection to database
+    Connection to local or mounted (NFS etc.) directory: commands are run by local shell in the directory,
+    built-in search scans files directly
     """
 
     def __init__(self):
+        """
+        Class constructor
+        """
+        self.conn_args = {}
+        self.proc = None  # process of running command
+        self.is_cancelled = False  # was the last command cancelled?
+
+    def connect(self, **conn_args):
+        """
+        Check directory
+
+        :param conn_args: connection arguments
+        """
+        if not os.path.isdir(conn_args['remote_dir']):
+            raise FileNotFoundError(ERR_LOCAL_DIR.format(conn_args['remote_dir']))
+        self.conn_args = conn_args
+
+    def exec_cmd(self, cmd) -> [str]:
+        """
+        Execute command
+
+        :param cmd: command string
+        :return: command output
+        """
+        return list(self.exec_cmd_iter(cmd))
+
+    def exec_cmd_iter(self, cmd, is_gzip: bool = False):
+        """
+        Execute command by local shell, output is passed by lines
+
+        :param cmd: command string
+        :param is_gzip: Not used, output of local command is not compressed
+        :return: command output iterator
+        """
+        self.is_cancelled = False
+        proc = subprocess.Popen(cmd, shell=True, cwd=self.conn_args['remote_dir'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.proc = proc
+        try:
+            yield from io.TextIOWrapper(proc.stdout, encoding='utf-8', errors='replace', newline='\n')
+        finally:
+            if proc.poll() is None:  # output is not read to the end
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+            self.proc = None
+
+    def search_iter(self, source_name: str, search_str: str, search_date: str):
+        """
+        Built-in search of log records in files of source (see localscan.search_iter)
+
+        :param source_name: File name mask
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD", files and records with date >= search_date are searched
+        :return: Output lines iterator, the same as output of BLOCK_SEARCH_CMD
+        """
+        self.is_cancelled = False
+        return localscan.search_iter(self.conn_args['remote_dir'], source_name, search_str, search_date,
+                                     lambda: self.is_cancelled, self.conn_args['scan_chunk_size'],
+                                     self.conn_args['scan_workers'])
+
+    def cancel(self):
+        """
+        Cancel running command or search
+        """
+        self.is_cancelled = True
+        proc = self.proc
+        if proc is not None:
+            proc.kill()
+
+    def close(self):
+        return None
+
+
+class LocalNode(SSHNode):
+    """
+    Node of local or mounted (NFS etc.) files: built-in search (source mode="block") maps files into memory and scans
+    them by pool of processes, other commands (sources mode="cmd", file parts, follow mode) are run by local shell
+    """
+
+    def __init__(self, trace_fun: conn.TracingFun, name: str, local_dir: str,
+                 chunk_size: int = localscan.SCAN_CHUNK_SIZE, workers: int = localscan.SCAN_WORKERS):
+        """
+        Class constructor
+
+        :param trace_fun: Callback tracing function
+        :param name: External node name
+        :param local_dir: Directory of files
+        :param chunk_size: Approx. size of file chunk scanned by one process, bytes
+        :param workers: Count of processes of scan pool, 0 - count of CPUs
+        """
+        super().__init__(trace_fun, name, local_dir, '', '', local_dir, '', '')
+        self.conn_args.update(scan_chunk_size=chunk_size, scan_workers=workers)
+
+    def create_conn(self):
+        return LocalNodeConn()
+
+    def shutdown(self):
+        """
+        Stop processes of scan pool
+        """
+        localscan.shutdown_pool()
+
+    def prepare_in_cmd(self, source, cmd):
+        return cmd  # command is run in the directory
+
+    def is_gzip_out(self, source: conn.Source) -> bool:
+        return False
+
+    def search_iter(self, source: conn.Source, search_str: str, search_date: str):
+        """
+        Do search, built-in search of log records (source mode="block") scans files without shell
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD", used if not empty for search with date >= search_date
+        :return: Search result iterator
+        """
+        if source.mode != conn.SOURCE_MODE_BLOCK:
+            yield from super().search_iter(source, search_str, search_date)
+            return
+
+        self.can_sort = False
+        if self.conn is None:
+            return
+
+        if self.trace_fun:
+            self.trace_fun(INFO_SEARCH_LOCAL.format(search_str, source.source_name, search_date))
+        try:
+            out = self.conn.search_iter(source.source_name, search_str, search_date)
+            for line in self.prepare_out_iter(out, source):
+                yield self.node_record(line)
+        except Exception as ex:
+            self.can_sort = False
+            if self.trace_fun:
+                self.trace_fun(conn.INFO_EXEC_FAILED.format(self.name, ", ".join([str(arg) for arg in ex.args])), True)
+
+
+class SQLSessionPool:
+    """
+    Pool of database sessions of node (cx_Oracle.SessionPool created on first use),
+    sessions are kept open between searches
+    """
+
+    def __init__(self, min_sessions: int, max_sessions: int, idle_timeout: int, is_ping: bool):
+        """
+        Class constructor
+
+        :param min_sessions: Min count of open sessions
+        :param max_sessions: Max count of open sessions
+        :param idle_timeout: Idle time (sec.) after which sessions above 'min_sessions' are closed
+        :param is_ping: Check session by ping when it is taken from pool?
+        """
+        self.min_sessions = min_sessions
+        self.max_sessions = max(max_sessions, min_sessions, 1)
+        self.idle_timeout = idle_timeout
+        self.is_ping = is_ping
+
+        self.lock = threading.Lock()
+        self.pool = None  # cx_Oracle.SessionPool
+
+    def acquire(self, user: str, password: str, dsn: str):
+        """
+        Take session from pool
+
+        :return: Healthy session (cx_Oracle.Connection), pool the session is taken from (passed to release)
+        """
+        with self.lock:
+            if self.pool is None:
+                self.pool = cx_Oracle.SessionPool(user, password, dsn, min=self.min_sessions, max=self.max_sessions,
+                                                  increment=1, threaded=True, getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT)
+                self.pool.timeout = self.idle_timeout
+            pool = self.pool
+
+        session = pool.acquire()
+        if self.is_ping:
+            try:
+                session.ping()
+            except cx_Oracle.Error:
+                pool.drop(session)  # session was closed by server or network, open new one
+                session = pool.acquire()
+        return session, pool
+
+    def release(self, session, pool):
+        """
+        Return session to the pool it was taken from, session of closed pool is already closed by the pool
+
+        :param session: Session
+        :param pool: Pool returned by acquire
+        """
+        with self.lock:
+            if pool is self.pool:
+                pool.release(session)
+
+    def close(self):
+        """
+        Close all sessions
+        """
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.close(force=True)
+
+
+class SQLNodeConn(conn.ConnABC):
+    """
+    Connection to database.
+    Rows are fetched by batches of 'arraysize' rows, LOBs are fetched as strings together with rows
+    """
+
+    def __init__(self, session_pool: SQLSessionPool = None):
+        """
+        Class constructor
+
+        :param session_pool: Pool of sessions, None - new session is opened by each connect
+        """
         self.conn = None
         self.cursor = None
+        self.session_pool = session_pool
+        self.pool = None  # cx_Oracle.SessionPool of session
+
+    @staticmethod
+    def output_type_handler(cursor, name, default_type, size, precision, scale):
+        """
+        Fetch CLOB columns as strings (no extra round trip per LOB value)
+        """
+        if default_type == cx_Oracle.DB_TYPE_CLOB:
+            return cursor.var(cx_Oracle.DB_TYPE_LONG, arraysize=cursor.arraysize)
+        if default_type == cx_Oracle.DB_TYPE_NCLOB:
+            return cursor.var(cx_Oracle.DB_TYPE_LONG_NVARCHAR, arraysize=cursor.arraysize)
 
     def connect(self, **conn_args):
+        load_driver('cx_Oracle')
         if conn_args['sid'] != "":
             dns = cx_Oracle.makedsn(*(conn_args['node_name'].split(':', 2)), sid=conn_args['sid'])
 
         else:
             dns = cx_Oracle.makedsn(*(conn_args['node_name'].split(':', 2)), service_name=conn_args['service_name'])
 
-        self.conn = cx_Oracle.connect(conn_args['user'], conn_args['password'], dns)
+        if self.session_pool is not None:
+            self.conn, self.pool = self.session_pool.acquire(conn_args['user'], conn_args['password'], dns)
+        else:
+            self.conn = cx_Oracle.connect(conn_args['user'], conn_args['password'], dns)
+        self.conn.outputtypehandler = SQLNodeConn.output_type_handler
+        self.conn.stmtcachesize = conn_args.get('stmt_cache_size', DB_STMT_CACHE_SIZE)
 
         self.cursor = self.conn.cursor()
+        self.cursor.arraysize = conn_args.get('array_size', DB_ARRAY_SIZE)
+        self.cursor.prefetchrows = conn_args.get('prefetch_rows', DB_PREFETCH_ROWS)
 
     def exec_cmd(self, cmd):
         try:
-            self.cursor.execute(cmd)
-            res = self.cursor.fetchall()
+            res = list(self.exec_cmd_iter(cmd))
         except Exception as ex:
             res = None
         return res
 
+    def exec_cmd_iter(self, cmd, params: dict = None):
+        """
+        Execute statement, rows are fetched by batches as they are consumed
+
+        :param cmd: Statement
+        :param params: Values of bind variables by name (lower case), only variables used by statement are bound
+        :return: Rows iterator
+        """
+        self.cursor.prepare(cmd)  # statement is taken from statement cache if it was executed by pooled session
+        binds = {}
+        if params:
+            for name in self.cursor.bindnames():
+                if name.lower() in params:
+                    binds[name] = params[name.lower()]
+        self.cursor.execute(None, binds)
+        while True:
+            rows = self.cursor.fetchmany()
+            if not rows:
+                break
+            yield from rows
+
+    def cancel(self):
+        """
+        Cancel running statement
+        """
+        if self.conn is not None:
+            self.conn.cancel()
+
     def close(self):
         self.cursor.close()
-        self.conn.close()
+        if self.session_pool is not None:
+            self.session_pool.release(self.conn, self.pool)  # keep session open for next searches
+        else:
+            self.conn.close()
 
 
 class SQLNode(conn.Node):
@@ -267,7 +1222,8 @@ class SQLNode(conn.Node):
     """
 
     def __init__(self, trace_fun: conn.TracingFun, name: str, node_name: str, user: str, password: str, sid: str,
-                 service_name: str):
+                 service_name: str, array_size: int = DB_ARRAY_SIZE, prefetch_rows: int = DB_PREFETCH_ROWS,
+                 stmt_cache_size: int = DB_STMT_CACHE_SIZE, session_pool: SQLSessionPool = None):
         """
         Class constructor
 
@@ -278,13 +1234,68 @@ class SQLNode(conn.Node):
         :param password: User password
         :param sid: Service Id, or
         :param service_name: Service name
+        :param array_size: Count of rows fetched by one round trip (rows are formatted by batches of this size)
+        :param prefetch_rows: Count of rows prefetched by statement execution
+        :param stmt_cache_size: Count of statements cached by connection (reused by searches with session pool only)
+        :param session_pool: Pool of sessions, None - session is opened/closed by each search
 
         """
+        self.session_pool = session_pool
         super().__init__(trace_fun, name, node_name=node_name, user=user, password=password, sid=sid,
-                         service_name=service_name)
+                         service_name=service_name, array_size=array_size, prefetch_rows=prefetch_rows,
+                         stmt_cache_size=stmt_cache_size)
+
+        self.bind_params = None  # values of bind variables of running search
 
     def create_conn(self):
-        return SQLNodeConn()
+        return SQLNodeConn(self.session_pool)
+
+    def shutdown(self):
+        """
+        Close pooled sessions
+        """
+        if self.session_pool is not None:
+            self.session_pool.close()
+
+    def search_iter(self, source: conn.Source, search_str: str, search_date: str):
+        """
+        Do search. Besides {{...}} substitution, statement of source may use bind variables
+        :search_str, :search_date, :source_name - statement text does not depend on search values
+        and is reused by statement cache
+
+        :param source: Source
+        :param search_str: Search string
+        :param search_date: Search date in format "YYYY-MM-DD"
+        :return: Search result iterator
+        """
+        self.bind_params = {'search_str': search_str, 'search_date': search_date, 'source_name': source.source_name}
+        try:
+            yield from super().search_iter(source, search_str, search_date)
+        finally:
+            self.bind_params = None
+
+    def read_out_iter(self, source: conn.Source, cmd: str):
+        return self.conn.exec_cmd_iter(cmd, self.bind_params)
+
+    def prepare_out_iter(self, out, source: conn.Source):
+        """
+        Format rows by batches as they are fetched, so first rows are shown before the whole result is fetched
+
+        :param out: Rows iterator
+        :param source: Source
+        :return: Output strings iterator
+        """
+        batch_size = max(self.conn_args['array_size'], 1)
+        batch = []
+        for row in out:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                res_list, self.can_sort = self.prepare_out_str(batch, source)
+                yield from res_list
+                batch = []
+
+        res_list, self.can_sort = self.prepare_out_str(batch, source)
+        yield from res_list
 
     def prepare_out_str(self, out, source: conn.Source) -> [[str], bool]:
         res_list = []
@@ -306,17 +1317,18 @@ class LogConnection(conn.Connection):
     Log connection
     """
 
-    def __init__(self, conf_filename: str, trace_fun: conn.TracingFun = None):
+    def __init__(self, conf_filename: str, trace_fun: conn.TracingFun = None, progress_fun: conn.ProgressFun = None):
         """
         Class constructor
 
         :param conf_filename: Configuration file name (*.config.xml)
         :param trace_fun: Callback tracing function
+        :param progress_fun: Callback progress function
         """
         self.tree = None
         self.keys = {}
         self.nodegroups = []
-        super().__init__(conf_filename, trace_fun)
+        super().__init__(conf_filename, trace_fun, progress_fun)
 
     def get_tag(self, e, tag):
         """
@@ -342,6 +1354,17 @@ class LogConnection(conn.Connection):
             raise ExConfErrorMissingAttr(self.conf_filename, self.tree.getpath(e), attr)
         return res
 
+    def get_text(self, e):
+        """
+        Get text of element
+        :param e: element
+        :return: text, not empty
+        """
+        res = e.text
+        if not res or not res.strip():
+            raise ExConfErrorMissingTag(self.conf_filename, self.tree.getpath(e), 'text()')
+        return res
+
     def parse_xml_config(self, tree: et._ElementTree):
         """
         Read configuration
@@ -362,16 +1385,45 @@ class LogConnection(conn.Connection):
                 key_password = e.get('password', '')
                 self.keys[key_name] = [key_filename, key_password]
 
+            # Cache of search results (used by nodegroups with result-cache="1"), max size in MB
+            result_cache = ResultCache(self.conf_filename.rsplit('.config.xml', 1)[0] + RESULT_CACHE_DIR_EXT,
+                                       int(root.get('result-cache-size', str(RESULT_CACHE_SIZE))))
+
+            # Post-processing of large results (XML indent, message columns) by pool of processes
+            postprocessor.configure(root.get('postproc', '0') == '1',
+                                    int(root.get('postproc-min-records', str(POSTPROC_MIN_RECORDS))),
+                                    int(root.get('postproc-batch-size', str(POSTPROC_BATCH_SIZE))),
+                                    int(root.get('postproc-workers', str(POSTPROC_WORKERS))))
+
             # Read nodegroups
 
             self.nodegroups = []
             for eg in root.findall('./nodegroups/nodegroup'):
                 ng_name = self.get_attr(eg, 'name')
                 ng_type = eg.get('type', 'file')
+                max_parallel = int(eg.get('max-parallel', '0'))  # 0 - all nodes at once
+                chunk_size = int(eg.get('chunk-size', str(conn.CHUNK_SIZE)))
+
+                # open connections pool (file nodes only): idle timeout 0 - connect/close on each operation
+                idle_timeout = int(eg.get('conn-idle-timeout', str(CONN_IDLE_TIMEOUT)))
+                keepalive = int(eg.get('keepalive', str(CONN_KEEPALIVE)))
+                compress = eg.get('compress', COMPRESS_NONE)  # 'none', 'transport', 'gzip', may be set by node
+                pool = conn.ConnPool(idle_timeout) if (ng_type == 'file' and idle_timeout > 0) else None
+                is_cached = ng_type == 'file' and eg.get('result-cache', '0') == '1'
+
                 nodes = []
                 for e in eg.iterchildren('node'):
                     node = []
                     name = self.get_attr(e, 'name')
+
+                    if ng_type == 'local':
+                        scan_chunk_size = int(e.get('scan-chunk-size', eg.get('scan-chunk-size', '0')))  # MB
+                        node = LocalNode(self.trace_fun, name, self.get_attr(e, 'local-dir'),
+                                         scan_chunk_size * 1024 * 1024 or localscan.SCAN_CHUNK_SIZE,
+                                         int(eg.get('scan-workers', str(localscan.SCAN_WORKERS))))
+                        nodes.append(node)
+                        continue
+
                     node_name = self.get_attr(e, 'node-name')
                     user = self.get_attr(e, 'user')
                     password = e.get('password')
@@ -388,12 +1440,25 @@ class LogConnection(conn.Connection):
                                 key_password = k[1]
 
                         node = SSHNode(self.trace_fun, name, node_name, user, password, remote_dir, key_filename,
-                                       key_password)
+                                       key_password, keepalive, e.get('compress', compress))
                     elif ng_type == 'database':
                         sid = e.get('sid')
                         service_name = e.get('service-name')
-
-                        node = SQLNode(self.trace_fun, name, node_name, user, password, sid, service_name)
+                        array_size = int(e.get('array-size', eg.get('array-size', str(DB_ARRAY_SIZE))))
+                        prefetch_rows = int(e.get('prefetch-rows', eg.get('prefetch-rows', str(DB_PREFETCH_ROWS))))
+                        stmt_cache_size = int(e.get('stmt-cache-size',
+                                                    eg.get('stmt-cache-size', str(DB_STMT_CACHE_SIZE))))
+
+                        # session pool: max count of sessions 0 - open/close session on each search
+                        session_pool = None
+                        pool_max = int(e.get('pool-max', '0'))
+                        if pool_max > 0:
+                            session_pool = SQLSessionPool(int(e.get('pool-min', str(DB_POOL_MIN))), pool_max,
+                                                          int(e.get('pool-idle-timeout', str(DB_POOL_IDLE_TIMEOUT))),
+                                                          e.get('pool-ping', '1') == '1')
+
+                        node = SQLNode(self.trace_fun, name, node_name, user, password, sid, service_name,
+                                       array_size, prefetch_rows, stmt_cache_size, session_pool)
 
                     if node:
                         nodes.append(node)
@@ -412,7 +1477,8 @@ class LogConnection(conn.Connection):
                             is_xml = True if len(fpair) == 2 and fpair[1] == 'xml' else False
                             expr_fields.append(conn.OutField(fpair[0], is_xml))
                     expr = e.text
-                    sources.append(conn.Source(name, source_name, expr, expr_fields))
+                    mode = e.get('mode', conn.SOURCE_MODE_CMD)  # 'cmd', 'block' - built-in search of log records
+                    sources.append(conn.Source(name, source_name, expr, expr_fields, mode))
 
                 ep = self.get_tag(eg, 'patterns')
 
@@ -435,10 +1501,18 @@ class LogConnection(conn.Connection):
                 for e in ep.iterchildren('msg-column'):
                     name = self.get_attr(e, 'name')
                     is_main = e.get('main', '0')
-                    pt_msg_columns.append(conn.ColumnPattern(name, e.text, bool(int(is_main))))
+                    col_type = e.get('type', 'regex')  # 'regex', 'xml-tag'
+                    expr = self.get_text(e)
+                    pt_msg_columns.append(conn.ColumnPattern(name, expr.strip() if col_type == 'xml-tag' else expr,
+                                                             bool(int(is_main)), col_type))
+
+                # xml tags indexed to find related messages (correlationId etc.)
+                key_tags = [e.text.strip() for e in ep.iterchildren('key-tag') if e.text and e.text.strip()]
 
-                patterns = conn.Patterns(pt_sort, pt_msg_columns)
-                self.nodegroups.append(SSHNodeGroup(self.trace_fun, ng_name, ng_type, nodes, sources, patterns))
+                patterns = conn.Patterns(pt_sort, pt_msg_columns, key_tags)
+                self.nodegroups.append(SSHNodeGroup(self.trace_fun, ng_name, ng_type, nodes, sources, patterns,
+                                                    max_parallel, pool, chunk_size,
+                                                    result_cache if is_cached else None))
 
         except ExConfErrorMissingTag as ex:
             self.trace_fun(ex.message)
@@ -446,6 +1520,13 @@ class LogConnection(conn.Connection):
         except ExConfErrorMissingAttr as ex:
             self.trace_fun(ex.message)
 
+    def close(self):
+        """
+        Close open connections of all nodegroups, stop post-processing pool
+        """
+        super().close()
+        postprocessor.shutdown()
+
     def get_file_part(self, ng_index, source_name, file_name, num_from, num_to):
         """
         Get part of file by line number
@@ -457,13 +1538,11 @@ class LogConnection(conn.Connection):
         :param num_to: Number of ending line
         """
 
-        # command format:
-        # awk '(NR >= 12630) && (NR <= 12680) {print FILENAME, ":", FNR, ":", $0}' './server.log'
+        # lines are read from the nearest checkpoint of file index, for example:
+        # tail -c +1048577 './server.log' | head -n 51 | awk -v l=12630 -v a=12630 ... '{... print f ":" l ":" $0 ...}'
         if num_from <= 0:
-            num_from = 0
-        cmd = r'''awk '(NR >= %d) && (NR <= %d) {print FILENAME ":" FNR ":" $0}' '%s' ''' \
-              % (num_from, num_to, file_name)
+            num_from = 1
 
         self.trace_fun(INFO_GET_LOG_PART.format(num_from, num_to, file_name))
 
-        return self.exec_cmd(ng_index, source_name, cmd)
+        return self.nodegroups[ng_index].get_file_part(source_name, file_name, num_from, num_to)
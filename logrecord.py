@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         logrecord.py
+# Purpose:      Output record of node with header fields (node, file, line number, date-time) parsed once
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+
+class LogRecord:
+    """
+    Output record: header fields are parsed once, when record is read from node,
+    later stages (sorting, views, reading file parts) use them instead of parsing the text again.
+    Text of record is 'node:file:line:body' (header fields that are not known are omitted)
+    """
+
+    __slots__ = ('node', 'file', 'line_number', 'timestamp', 'body')
+
+    def __init__(self, body: str, file: str = '', line_number: int = 0, timestamp: str = '', node: str = ''):
+        """
+        Class constructor
+
+        :param body: Record text without header
+        :param file: Source file name, '' - not known (database row, command output)
+        :param line_number: Number of the first line of record in file
+        :param timestamp: Date-time of record, e.g. 2019-01-09 09:56:18,893, '' - not known
+        :param node: Node name
+        """
+        self.body = body
+        self.file = file
+        self.line_number = line_number
+        self.timestamp = timestamp
+        self.node = node
+
+    def header(self) -> str:
+        """
+        Get header of record text
+
+        :return: Header, e.g. 'Node 1:./server.log:12345:'
+        """
+        header = self.node + ':' if self.node else ''
+        if self.file:
+            header += '{0}:{1}:'.format(self.file, self.line_number)
+        return header
+
+    def __str__(self):
+        return self.header() + self.body
+
+    def __repr__(self):
+        return 'LogRecord({0!r})'.format(str(self))
+
+    def to_list(self) -> list:
+        """
+        Get record fields (except node) as json serializable list
+
+        :return: [file, line number, date-time, body]
+        """
+        return [self.file, self.line_number, self.timestamp, self.body]
+
+    @staticmethod
+    def from_list(values: list, node: str = ''):
+        """
+        Make record of fields
+
+        :param values: [file, line number, date-time, body] (see to_list)
+        :param node: Node name
+        :return: LogRecord
+        """
+        file, line_number, timestamp, body = values
+        return LogRecord(body, file, line_number, timestamp, node)
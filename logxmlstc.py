@@ -13,10 +13,14 @@
 
 import wx
 import xmlstc
+from msgcache import indent_cache
+from postproc import postprocessor
+from logrecord import LogRecord
 
 import wx.stc as stc
-from yattag import indent
 import re
+from array import array
+from bisect import bisect_right
 
 # 	Messages
 
@@ -61,6 +65,9 @@ class LogXmlSTC(xmlstc.XmlSTC):
 
         self.p_sort = None
 
+        self.records = []  # records shown in widget
+        self.record_lines = array('l')  # number of the first widget line of each record
+
         super(LogXmlSTC, self).__init__(parent_panel)
 
         # pn_OutLog is parent of newly created stc_OutLog: StyledTextCtrl
@@ -127,16 +134,42 @@ class LogXmlSTC(xmlstc.XmlSTC):
 
         :param text_lst: Input text
         """
+        self.clear_output()
+        return self.append_output(text_lst, patterns)
+
+    def clear_output(self):
+        """
+        Clear text in widget
+        """
         self.ClearSelections()
         self.ClearAll()
+        self.records = []
+        self.record_lines = array('l')
 
-        res_lst = []
-        for line in text_lst:
-            try:
-                xml_line = indent(line)
-            except Exception as ex:
-                xml_line = line
-            res_lst.append(xml_line + "\n\n")
+    def append_output(self, text_lst, patterns = []):
+        """
+        Append text to widget (next chunk of search result)
+
+        :param text_lst: Input text
+        """
+        res_lst = LogXmlSTC.format_output(text_lst)
+        self.append_text(res_lst, patterns, text_lst)
+
+        return res_lst
+
+    def append_text(self, res_lst, patterns = [], records = None):
+        """
+        Append formatted text to widget
+
+        :param res_lst: Formatted text (see format_output)
+        :param records: Records (LogRecord) the text was formatted from, None - text is not mapped to records
+        """
+        if records is not None:
+            line = self.GetLineCount() - 1  # widget text ends with empty line
+            for record, res_line in zip(records, res_lst):
+                self.records.append(record)
+                self.record_lines.append(line)
+                line += res_line.count('\n')
 
         self.AppendText(''.join(res_lst))
 
@@ -147,55 +180,67 @@ class LogXmlSTC(xmlstc.XmlSTC):
         self.custom_colourise(patterns)
         self.Update()
 
+    @staticmethod
+    def format_output(text_lst):
+        """
+        Format search result: indent XML of each record (may be called outside of GUI thread)
+
+        :param text_lst: Input records (LogRecord) or text lines
+        :return: Formatted text
+        """
+        res_lst = []
+        # record body read from node is indented already, lines not cached are indented (large output in pool)
+        bodies = [line.body if isinstance(line, LogRecord) else line for line in text_lst]
+        for line, xml_str in zip(text_lst, postprocessor.indent_cached(bodies)):
+            xml_line = line.header() + xml_str if isinstance(line, LogRecord) else xml_str
+            res_line = xml_line + "\n\n"
+            indent_cache.put(res_line, xml_line)
+            res_lst.append(res_line)
+
         return res_lst
 
     def set_output_extended(self, text_lst, patterns = []):
         """
         Set text in widget
 
-        :param text_lst: Log content
+        :param text_lst: Part of file: records (LogRecord) read from node
         """
-        self.ClearAll()
-        self.ClearSelections()
-
-        pattern_xml = r"<\/?.*?:?.+?>"
-        p_xml = re.compile(pattern_xml)
-
-        pattern_dt = r"(^[^:]*:[0-9]*:\s*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"
-        p_dt = re.compile(pattern_dt)
-
-        res_lst = []
-        xml_lst = []
-
-        for line in text_lst:
-            if p_dt.match(line):
-                xml_line = "\n\n"
-                if xml_lst:
-                    xml_str = "".join(xml_lst)
-                    xml_line = indent(xml_str) + xml_line
+        res_lst = LogXmlSTC.format_output_extended(text_lst)
+        self.set_text_extended(res_lst, patterns, text_lst)
 
-                res_lst.append(xml_line)
-                xml_lst = []
-
-            if p_xml.match(line):
-                line_str = line.strip(' \t\n\r')
-            else:
-                line_str = line
-            xml_lst.append(line_str)
+        return res_lst
 
-        if xml_lst:
-            xml_str = "".join(xml_lst)
-            xml_line = indent(xml_str)
-            res_lst.append(xml_line)
+    def set_text_extended(self, res_lst, patterns = [], records = None):
+        """
+        Set formatted log content in widget
 
-        self.AppendText(''.join(res_lst).strip())
+        :param res_lst: Formatted log content (see format_output_extended)
+        :param records: Records (LogRecord) the text was formatted from, None - text is not mapped to records
+        """
+        self.clear_output()
+        self.append_text(res_lst, patterns, records)
 
-        # adjust line number margin width
-        width = self.TextWidth(stc.STC_STYLE_LINENUMBER, str(self.GetLineCount()) + ' ')
-        self.SetMarginWidth(0, width)
+    @staticmethod
+    def format_output_extended(text_lst):
+        """
+        Format part of file: records are grouped and indented by node already, each one is shown with
+        'file:line:' header, lines out of records are shown as they are read (may be called outside of GUI thread)
 
-        self.custom_colourise(patterns)
-        self.Update()
+        :param text_lst: Part of file: records (LogRecord) read from node
+        :return: Formatted log content
+        """
+        res_lst = []
+        # record body read from node is indented already
+        indented = iter(postprocessor.indent_cached([record.body for record in text_lst if record.file]))
+        for record in text_lst:
+            if not record.file:  # line out of records, prefixed by 'file:line:'
+                res_lst.append(record.body)
+                continue
+
+            xml_line = '{0}:{1}:{2}'.format(record.file, record.line_number, next(indented))
+            res_line = xml_line + "\n\n"
+            indent_cache.put(res_line, xml_line)
+            res_lst.append(res_line)
 
         return res_lst
 
@@ -270,10 +315,17 @@ class LogXmlSTC(xmlstc.XmlSTC):
         :param num_after: Number of file lines after current
         """
 
-        # Get filename and line number from header of current line
-
         curr_pos = self.GetCurrentPos()
         line_number = self.LineFromPosition(curr_pos)
+
+        # Get filename and line number of record containing current line
+        i = bisect_right(self.record_lines, line_number) - 1
+        if i >= 0 and isinstance(self.records[i], LogRecord) and self.records[i].file:
+            record = self.records[i]
+            self.parent.read_file_part(record.file, record.line_number - num_before, record.line_number + num_after)
+            return
+
+        # Get filename and line number from header of current line (file part, lines are not mapped to records)
         line = self.GetLine(line_number)
         if not (line and line.strip()):
             return
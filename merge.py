@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         merge.py
+# Purpose:      K-way merge of sorted output of nodes
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import heapq
+from operator import itemgetter
+from typing import Callable, Iterator
+
+# Min average length of sorted runs for k-way merge, shorter runs are sorted as a whole
+MIN_AVG_RUN_LEN = 16
+
+KeyFun = Callable
+
+
+class MergeEngine:
+    """
+    Merge of output records of several nodes by sorting key.
+    Records of each node are split into already sorted runs (e.g. one run per log file),
+    the runs are merged with heap in O(n log k), sorting key is computed once per record
+    """
+
+    def __init__(self, key_fun: KeyFun):
+        """
+        Class constructor
+
+        :param key_fun: Function (record) -> sorting key
+        """
+        self.key_fun = key_fun
+
+        self.runs = []  # sorted runs of all sources: lists of (key, record)
+        self.last_runs = {}  # source id -> current (last) run of the source
+        self.count = 0  # count of records
+
+    def add(self, source_id, records: [str]):
+        """
+        Add next records of source
+
+        :param source_id: Source (node) identifier
+        :param records: Records in the order they were produced by source
+        """
+        key_fun = self.key_fun
+        run = self.last_runs.get(source_id)
+        last_key = run[-1][0] if run else None
+        for record in records:
+            key = key_fun(record)
+            if run is None or key < last_key:  # key order broken: start new run
+                run = []
+                self.runs.append(run)
+            run.append((key, record))
+            last_key = key
+
+        if run is not None:
+            self.last_runs[source_id] = run
+        self.count += len(records)
+
+    def is_mergeable(self) -> bool:
+        """
+        Are runs long enough for k-way merge?
+
+        :return: bool, False - records have to be sorted as a whole
+        """
+        return len(self.runs) <= 1 or self.count >= MIN_AVG_RUN_LEN * len(self.runs)
+
+    def merge(self) -> Iterator[str]:
+        """
+        Merge records of all sources by sorting key (stable: equal keys keep order of sources and runs)
+
+        :return: Sorted records iterator
+        """
+        if self.is_mergeable():
+            items = heapq.merge(*self.runs, key=itemgetter(0))
+        else:
+            items = sorted([item for run in self.runs for item in run], key=itemgetter(0))
+
+        for _, record in items:
+            yield record
+
+    def unsorted(self) -> Iterator[str]:
+        """
+        Records without sorting: runs in the order they were started, records of each run in the order
+        they were added (records of each source keep their order, records of sources are not interleaved
+        as they were added, but grouped by runs)
+
+        :return: Records iterator
+        """
+        for run in self.runs:
+            for _, record in run:
+                yield record
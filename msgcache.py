@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         msgcache.py
+# Purpose:      Cache of indented (pretty-printed) XML form of messages, shared by all views
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import threading
+from collections import OrderedDict
+
+from yattag import indent
+
+# Max total length (in chars) of cached texts
+INDENT_CACHE_SIZE = 32 * 1024 * 1024
+
+
+def indent_text(text: str) -> str:
+    """
+    Indent XML of message
+
+    :param text: Message text
+    :return: Indented text, 'text' as is - if it is not valid XML
+    """
+    try:
+        return indent(text)
+    except Exception:
+        return text
+
+
+class IndentCache:
+    """
+    LRU cache: message text -> its indented form.
+    Message is indented once, when it is read from node, all views (output, message tabs, tag values)
+    get the same indented string from cache instead of parsing XML again
+    """
+
+    def __init__(self, max_size: int = INDENT_CACHE_SIZE):
+        """
+        Class constructor
+
+        :param max_size: Max total length (in chars) of cached texts
+        """
+        self.max_size = max_size
+
+        self.lock = threading.Lock()
+        self.items = OrderedDict()  # message text -> indented text, in order of use
+        self.size = 0  # total length of cached texts
+
+    @staticmethod
+    def item_size(text: str, indented: str) -> int:
+        return len(text) + (len(indented) if indented is not text else 0)
+
+    def put(self, text: str, indented: str):
+        """
+        Store indented form of message
+
+        :param text: Message text
+        :param indented: Indented text
+        """
+        with self.lock:
+            old = self.items.pop(text, None)
+            if old is not None:
+                self.size -= self.item_size(text, old)
+            self.items[text] = indented
+            self.size += self.item_size(text, indented)
+
+            while self.size > self.max_size and self.items:  # evict least recently used
+                key, value = self.items.popitem(last=False)
+                self.size -= self.item_size(key, value)
+
+    def get(self, text: str) -> str:
+        """
+        Get indented form of message, indent it if it is not cached
+
+        :param text: Message text
+        :return: Indented text, 'text' as is - if it is not valid XML
+        """
+        indented = self.find(text)
+        if indented is not None:
+            return indented
+
+        indented = indent_text(text)
+        self.put(text, indented)
+        return indented
+
+    def find(self, text: str) -> str:
+        """
+        Get indented form of message if it is cached
+
+        :param text: Message text
+        :return: Indented text, None - text is not cached
+        """
+        with self.lock:
+            indented = self.items.get(text)
+            if indented is not None:
+                self.items.move_to_end(text)
+            return indented
+
+    def clear(self):
+        """
+        Remove all items
+        """
+        with self.lock:
+            self.items = OrderedDict()
+            self.size = 0
+
+
+# Cache shared by all modules
+indent_cache = IndentCache()
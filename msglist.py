@@ -12,9 +12,11 @@
 # ----------------------------------------------------------------------------
 
 import wx
-import re
 import wx.lib.mixins.listctrl as listmix
 
+import msgtable
+from postproc import postprocessor
+
 # Context menu strings
 
 MNU_COPY_CORRELATION_ID = u"Copy correlationId"
@@ -25,6 +27,9 @@ MNU_SHOW_ALL_WITH_SAME_CORRELATION_ID = u"Show all messages with same correlatio
 ID_COPY_CORRELATION_ID = wx.NewIdRef()
 ID_SHOW_ALL_WITH_SAME_CORRELATION_ID = wx.NewIdRef()
 
+# Count of rows used to compute column widths
+AUTOSIZE_SAMPLE = 200
+
 
 class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
     """
@@ -32,7 +37,7 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
     """
 
     def __init__(self, parent, parent_panel, id=wx.ID_ANY, pos=wx.DefaultPosition, size=wx.DefaultSize,
-                 style=wx.LC_REPORT | wx.LC_SINGLE_SEL):
+                 style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL):
 
         super(MsgListCtrl, self).__init__(parent_panel, id, pos, size, style)
         self.parent = parent
@@ -44,6 +49,12 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         self.msg_columns = []
         self.main_mgs_column = 1
 
+        self.extractor = msgtable.ColumnExtractor([])  # extractor of column values
+        self.table = msgtable.MsgTable(self.extractor)  # column values of messages, shown by OnGetItemText
+        self.is_autosized = False  # are column widths computed for current output?
+        self.sort_column = -1  # index of column the list is sorted by, -1 - not sorted
+        self.sort_reverse = False  # descending sort order?
+
         # Create popup menu of message list
 
         self.menu = wx.Menu()
@@ -52,6 +63,7 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         self.menu.Append(wx.MenuItem(self.menu, ID_SHOW_ALL_WITH_SAME_CORRELATION_ID,
                                      MNU_SHOW_ALL_WITH_SAME_CORRELATION_ID, wx.EmptyString, wx.ITEM_NORMAL))
         self.Bind(wx.EVT_LIST_ITEM_RIGHT_CLICK, self.OnRClick)
+        self.Bind(wx.EVT_LIST_COL_CLICK, self.OnColClick)
 
         self.Bind(wx.EVT_MENU, self.OnMenuMsgList, id=wx.ID_COPY)
         self.Bind(wx.EVT_MENU, self.OnMenuMsgList, id=wx.ID_SELECTALL)
@@ -61,9 +73,13 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
     def init_columns(self, msg_columns: list):
         self.msg_columns = msg_columns
 
-        self.DeleteAllItems()
+        self.SetItemCount(0)
 
         self.text_lst = []
+        self.extractor = msgtable.ColumnExtractor(msg_columns)
+        self.table = msgtable.MsgTable(self.extractor)
+        self.is_autosized = False
+        self.sort_column = -1
         self.DeleteAllColumns()
 
         # setup grid list columns
@@ -109,10 +125,65 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         :param col_index: indexes of columns that are substituted in format string
         :return: string, tab caption
         """
-        return format_str.format(*[self.GetItemText(msg_index, c) for c in col_index])
+        return format_str.format(*[self.table.get(msg_index, c) for c in col_index])
 
     def get_msg_number(self, msg_index):
-        return int(self.GetItemText(msg_index, 0))
+        return self.table.line_index[msg_index]
+
+    def OnGetItemText(self, item, col):
+        """
+        Get cell text of virtual list
+        """
+        return self.table.get(item, col)
+
+    def OnColClick(self, event):
+        """
+        Column header clicked: sort by column, next click - reverse order
+        """
+        col = event.GetColumn()
+        if col < 0:
+            return
+
+        self.sort_reverse = (not self.sort_reverse) if col == self.sort_column else False
+        self.sort_column = col
+
+        self.SetCursor(wx.Cursor(wx.CURSOR_WAIT))
+        try:
+            selected = self.get_selected_lines()
+            self.table.sort(self.sort_column, self.sort_reverse)  # column values are extracted for all rows
+            self.select_lines(selected)
+        finally:
+            self.SetCursor(wx.Cursor(wx.CURSOR_ARROW))
+        self.Refresh()
+
+    def get_selected_lines(self) -> set:
+        """
+        Get selected messages
+
+        :return: Indexes of message lines in output
+        """
+        selected = set()
+        row = self.GetFirstSelected()
+        while row >= 0:
+            selected.add(self.table.line_index[row])
+            row = self.GetNextSelected(row)
+        return selected
+
+    def select_lines(self, selected: set):
+        """
+        Select messages (rows are moved by sorting)
+
+        :param selected: Indexes of message lines in output (see get_selected_lines)
+        """
+        if not selected:
+            return
+        rows = self.table.find_rows(selected)
+        row = self.GetFirstSelected()
+        while row >= 0:
+            self.SetItemState(row, 0, wx.LIST_STATE_SELECTED)
+            row = self.GetNextSelected(row)
+        for row in rows:
+            self.SetItemState(row, wx.LIST_STATE_SELECTED, wx.LIST_STATE_SELECTED)
 
     def OnListItemActivated(self, event):
         """
@@ -129,35 +200,81 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
 
         :param text_lst: Text to add to control
         """
+        self.clear_output()
+        self.append_output(text_lst)
+
+    def clear_output(self):
+        """
+        Clear list of messages
+        """
+        self.text_lst = []
+        self.table.clear()
+        self.is_autosized = False
+        self.sort_column = -1
+        self.SetItemCount(0)
 
-        self.text_lst = text_lst
+    def append_output(self, text_lst):
+        """
+        Append messages to list (next chunk of search result)
 
-        self.DeleteAllItems()
+        :param text_lst: Text to add to control
+        """
+        table = self.extract_messages(text_lst, len(self.text_lst))
+        self.append_messages(text_lst, table)
 
-        pattern = []
-        p = []
+    def extract_messages(self, text_lst, first_index) -> msgtable.MsgTable:
+        """
+        Find messages in text lines (may be called outside of GUI thread).
+        Only main column is extracted, other columns are extracted when shown
 
-        for i, col in enumerate(self.msg_columns):  # enumerate ColumnPatterns
-            pattern.append(col.expr)  # re pattern
-            p.append(re.compile(pattern[i]))
+        :param text_lst: Text lines
+        :param first_index: Index of first line in whole list of lines
+        :return: Table of lines that are messages
+        """
+        return postprocessor.extract_messages(self.extractor, self.main_mgs_column, text_lst, first_index)
 
-        for i, line in enumerate(text_lst):
-            m = []
-            col_val = [str(i)]
-            for j, pv in enumerate(p):
-                m.append(pv.match(line))
-                col_val.append(m[j].group(1) if (m[j] is not None) else " ")
+    def append_messages(self, text_lst, table: msgtable.MsgTable):
+        """
+        Append messages to list
 
-            if m[self.main_mgs_column] is not None:  # is 'message' column?
-                self.Append(col_val)
+        :param text_lst: Text lines
+        :param table: Table of messages (see extract_messages)
+        """
+        first_index = len(self.table)
+        self.text_lst.extend(text_lst)
+
+        selected = None
+        if self.sort_column >= 0:
+            # new rows are merged into sorted ones, selected messages keep selected
+            selected = self.get_selected_lines()
+            self.table.merge(table, self.sort_column, self.sort_reverse)
+        else:
+            self.table.extend(table)
 
-            for j in range(len(self.msg_columns) - 1):  # last column expand to control width
-                self.SetColumnWidth(j + 1, wx.LIST_AUTOSIZE)
+        self.SetItemCount(len(self.table))
+        if selected:
+            self.select_lines(selected)
+        if not self.is_autosized and len(self.table) > 0:
+            self.autosize_columns()
 
-        self.Update()
-        if self.GetItemCount() > 0:
+        self.Refresh()
+        if first_index == 0 and self.GetItemCount() > 0:
             self.SetItemState(0, wx.LIST_STATE_SELECTED, wx.LIST_STATE_SELECTED)
 
+    def autosize_columns(self):
+        """
+        Set column widths by sample of rows (computed once per output, only sample rows are extracted)
+        """
+        n_rows = min(len(self.table), AUTOSIZE_SAMPLE)
+        for j in range(len(self.msg_columns) - 1):  # last column expand to control width
+            col = j + 1
+            width = self.GetTextExtent(self.GetColumn(col).GetText())[0]
+            for row in range(n_rows):
+                width = max(width, self.GetTextExtent(self.table.get(row, col))[0])
+            self.SetColumnWidth(col, width + 16)  # 16 - cell margins
+
+        self.is_autosized = True
+
     def get_msgs_by_correlation_id(self):
         self.parent.create_multi_msg_tag(self.get_msg_number(self.GetFirstSelected()), 'correlationId')
 
@@ -198,10 +315,7 @@ class MsgListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
 
     def GetRowText(self, idx):
         """ Get row text """
-        txt = list()
-        for col in range(self.GetColumnCount()):
-            txt.append(self.GetItemText(idx, col))
-        return "\t".join(txt)
+        return "\t".join(self.table.get_row(idx))
 
     def SelectAll(self):
         """ Select all text """
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         msgtable.py
+# Purpose:      Columnar table of message column values (model of the message list)
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import sys
+import heapq
+from array import array
+from operator import itemgetter
+
+import xmlfields
+
+# Value shown for column that was not found in message
+EMPTY_VALUE = " "
+
+# Column types: value extracted by regex, value of xml tag
+COL_TYPE_REGEX = "regex"
+COL_TYPE_XML_TAG = "xml-tag"
+
+
+class ColumnExtractor:
+    """
+    Extraction of column values from message line: regex columns are extracted one by one,
+    xml tag columns are extracted all together in one pass over the message
+    """
+
+    def __init__(self, msg_columns: list):
+        """
+        Class constructor
+
+        :param msg_columns: Column patterns (conn.ColumnPattern)
+        """
+        self.msg_columns = msg_columns
+        self.p_columns = [col.p_expr for col in msg_columns]  # compiled regexes, None - xml tag column
+
+        # xml tag columns: column index -> tag name
+        self.tag_columns = {i: col.expr for i, col in enumerate(msg_columns) if col.col_type == COL_TYPE_XML_TAG}
+        self.scanner = xmlfields.XmlTagScanner(self.tag_columns.values())
+
+    def extract(self, line: str, col: int) -> dict:
+        """
+        Extract value of column 'col' and values of columns extracted in the same pass
+
+        :param line: Message line
+        :param col: Column index
+        :return: Dictionary column index -> value, None - value is not found
+        """
+        if col in self.tag_columns:
+            found = self.scanner.scan(line)
+            return {c: found.get(tag) for c, tag in self.tag_columns.items()}
+
+        m = self.p_columns[col].match(line)
+        return {col: (m.group(1) or "") if (m is not None) else None}
+
+
+class MsgTable:
+    """
+    Messages table stored by columns: column 0 - index of message line in output, columns 1..n - extracted values.
+    Values are extracted lazily: on first request (shown in grid, sorting) and then memoized.
+    Repeating values (interface names, statuses etc.) are interned, so each distinct value is stored once
+    """
+
+    def __init__(self, extractor: ColumnExtractor):
+        """
+        Class constructor
+
+        :param extractor: Extractor of column values
+        """
+        self.extractor = extractor
+
+        n_columns = len(extractor.p_columns)
+        self.line_index = array('l')  # index of message line in output
+        self.lines = []  # message lines
+        self.columns = [[] for _ in range(n_columns)]  # extracted values by columns, None - not extracted yet
+
+    def __len__(self):
+        return len(self.line_index)
+
+    def append(self, line_index: int, line: str, values: [str]):
+        """
+        Append message row
+
+        :param line_index: Index of message line in output
+        :param line: Message line
+        :param values: Column values, None - value is extracted on request
+        """
+        self.line_index.append(line_index)
+        self.lines.append(line)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def append_extracted(self, line_index: int, line: str, extracted: dict):
+        """
+        Append message row with values extracted so far
+
+        :param line_index: Index of message line in output
+        :param line: Message line
+        :param extracted: Dictionary column index -> value (see ColumnExtractor.extract)
+        """
+        values = [None] * len(self.columns)
+        for c, v in extracted.items():
+            values[c] = sys.intern(v or EMPTY_VALUE)
+        self.append(line_index, line, values)
+
+    def extend(self, table):
+        """
+        Append rows of other table
+
+        :param table: MsgTable with the same columns
+        """
+        self.line_index.extend(table.line_index)
+        self.lines.extend(table.lines)
+        for column, other in zip(self.columns, table.columns):
+            column.extend(other)
+
+    def clear(self):
+        """
+        Remove all rows
+        """
+        self.line_index = array('l')
+        self.lines = []
+        self.columns = [[] for _ in self.columns]
+
+    def get(self, row: int, col: int) -> str:
+        """
+        Get cell value as shown in grid
+
+        :param row: Row index
+        :param col: Column index, 0 - index of message line
+        :return: Cell value
+        """
+        if col == 0:
+            return str(self.line_index[row])
+
+        value = self.columns[col - 1][row]
+        if value is None:  # extract and memoize
+            for c, v in self.extractor.extract(self.lines[row], col - 1).items():
+                if self.columns[c][row] is None:
+                    self.columns[c][row] = sys.intern(v or EMPTY_VALUE)
+            value = self.columns[col - 1][row]
+        return value
+
+    def get_row(self, row: int) -> [str]:
+        """
+        Get row values as shown in grid
+
+        :param row: Row index
+        :return: Cell values
+        """
+        return [self.get(row, col) for col in range(len(self.columns) + 1)]
+
+    def sort(self, col: int, reverse: bool = False):
+        """
+        Sort rows by column values (values of the column are extracted for all rows)
+
+        :param col: Column index, 0 - index of message line
+        :param reverse: Descending order?
+        """
+        keys = self.keys(col)
+        order = sorted(range(len(self)), key=keys.__getitem__, reverse=reverse)
+
+        self.line_index = array('l', [self.line_index[i] for i in order])
+        self.lines = [self.lines[i] for i in order]
+        self.columns = [[column[i] for i in order] for column in self.columns]
+
+    def merge(self, table, col: int, reverse: bool = False):
+        """
+        Append rows of other table to table sorted by column: rows of other table are sorted
+        and merged into existing ones in O(n) (existing rows go first among rows with equal values)
+
+        :param table: MsgTable with the same columns
+        :param col: Column index the table is sorted by, 0 - index of message line
+        :param reverse: Descending order?
+        """
+        table.sort(col, reverse)
+        items = heapq.merge(((key, 0, i) for i, key in enumerate(self.keys(col))),
+                            ((key, 1, i) for i, key in enumerate(table.keys(col))),
+                            key=itemgetter(0), reverse=reverse)
+        rows = [(t, i) for _, t, i in items]
+        tables = (self, table)
+
+        self.line_index = array('l', [tables[t].line_index[i] for t, i in rows])
+        self.lines = [tables[t].lines[i] for t, i in rows]
+        self.columns = [[(column, other)[t][i] for t, i in rows] for column, other in zip(self.columns, table.columns)]
+
+    def keys(self, col: int) -> list:
+        """
+        Get sorting keys: column values (extracted for all rows)
+
+        :param col: Column index, 0 - index of message line
+        :return: Values by rows
+        """
+        if col == 0:
+            return self.line_index
+        return [self.get(row, col) for row in range(len(self))]
+
+    def find_rows(self, line_indexes: set) -> [int]:
+        """
+        Find rows by indexes of message lines
+
+        :param line_indexes: Indexes of message lines in output
+        :return: Row indexes, ascending
+        """
+        return [row for row, line_index in enumerate(self.line_index) if line_index in line_indexes]
+
+
+def extract_messages(extractor: ColumnExtractor, main_column: int, text_lst: [str], first_index: int) -> MsgTable:
+    """
+    Find messages: lines matching main column (may be called outside of GUI thread).
+    Only main column is extracted, other columns are extracted on request
+
+    :param extractor: Extractor of column values
+    :param main_column: Index of main column
+    :param text_lst: Text lines
+    :param first_index: Index of first line in whole output
+    :return: Table of messages
+    """
+    table = MsgTable(extractor)
+    for i, line in enumerate(text_lst, first_index):
+        res = extractor.extract(line, main_column)
+        if res[main_column] is not None:  # is 'message' line?
+            table.append_extracted(i, line, res)
+
+    return table
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         postproc.py
+# Purpose:      Post-processing of large search results by pool of processes:
+#               XML indent of records, extraction of message columns
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import msgtable
+from msgcache import indent_cache, indent_text
+
+# Count of records processed in calling thread: smaller results are not passed to the pool
+POSTPROC_MIN_RECORDS = 2000
+# Count of records passed to process of the pool at once
+POSTPROC_BATCH_SIZE = 500
+# Count of processes, 0 - count of CPUs
+POSTPROC_WORKERS = 0
+# Max count of batches processed at once per caller (results are passed in order of batches)
+POSTPROC_WINDOW = 16
+
+_extractors = {}  # extractors of column values built in process of the pool: column patterns -> ColumnExtractor
+
+
+def indent_batch(texts: [str]) -> [str]:
+    """
+    Indent XML of messages (runs in process of the pool)
+
+    :param texts: Message texts
+    :return: Indented texts
+    """
+    return [indent_text(text) for text in texts]
+
+
+def extract_batch(msg_columns: list, main_column: int, lines: [str]) -> list:
+    """
+    Find messages: lines matching main column (runs in process of the pool)
+
+    :param msg_columns: Column patterns (conn.ColumnPattern)
+    :param main_column: Index of main column
+    :param lines: Text lines
+    :return: Messages only: [index of line in batch, extracted values (see ColumnExtractor.extract)]
+    """
+    key = tuple((col.expr, col.col_type) for col in msg_columns)
+    extractor = _extractors.get(key)
+    if extractor is None:
+        extractor = _extractors[key] = msgtable.ColumnExtractor(msg_columns)
+
+    found = []
+    for i, line in enumerate(lines):
+        res = extractor.extract(line, main_column)
+        if res[main_column] is not None:
+            found.append([i, res])
+    return found
+
+
+class PostProcessor:
+    """
+    Post-processing of search result: small results (up to 'min_records') are processed in calling thread,
+    records above it are split into batches processed by pool of processes, results are returned in original order.
+    Disabled by default (configuration attribute postproc="1")
+    """
+
+    def __init__(self, min_records: int = POSTPROC_MIN_RECORDS, batch_size: int = POSTPROC_BATCH_SIZE,
+                 workers: int = POSTPROC_WORKERS):
+        """
+        Class constructor
+
+        :param min_records: Count of records processed in calling thread
+        :param batch_size: Count of records passed to process at once
+        :param workers: Count of processes, 0 - count of CPUs
+        """
+        self.is_enabled = False
+        self.min_records = min_records
+        self.batch_size = batch_size
+        self.workers = workers
+
+        self.lock = threading.Lock()
+        self.pool = None  # created by the first large result
+
+    def configure(self, is_enabled: bool, min_records: int = POSTPROC_MIN_RECORDS,
+                  batch_size: int = POSTPROC_BATCH_SIZE, workers: int = POSTPROC_WORKERS):
+        """
+        Set parameters (see constructor), running pool is stopped
+        """
+        self.shutdown()
+        self.is_enabled = is_enabled
+        self.min_records = min_records
+        self.batch_size = max(batch_size, 1)
+        self.workers = workers
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        """
+        Get pool of processes, the pool is created once
+        """
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers or None)
+            return self.pool
+
+    def shutdown(self):
+        """
+        Stop processes of the pool
+        """
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False)
+                self.pool = None
+
+    def indent_iter(self, items):
+        """
+        Indent XML of records incrementally: the first 'min_records' records in calling thread,
+        next records by batches in pool, next batches are processed while results are passed
+
+        :param items: Iterator of [text, data]: text - XML to indent, None - item is passed as is;
+                      data - any value passed with the result
+        :return: Iterator of [indented text, data] in order of items
+        """
+        n = 0
+        batch = []  # items of next batch
+        pending = deque()  # [items, future] in order of batches
+        try:
+            for text, data in items:
+                if text is None and not batch and not pending:
+                    yield None, data
+                elif not self.is_enabled or n < self.min_records:
+                    n += 1
+                    yield indent_text(text), data
+                else:
+                    batch.append([text, data])
+                    if len(batch) >= self.batch_size:
+                        pending.append([batch, self.submit_indent(batch)])
+                        batch = []
+                        while pending and (pending[0][1].done() or len(pending) >= POSTPROC_WINDOW):
+                            yield from PostProcessor.indent_results(*pending.popleft())
+
+            if batch:
+                pending.append([batch, self.submit_indent(batch)])
+                batch = []
+            while pending:
+                yield from PostProcessor.indent_results(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def submit_indent(self, batch: list):
+        """
+        Pass batch of items to the pool, items passed as is are not sent
+
+        :param batch: Items [text, data]
+        :return: Future of indented texts
+        """
+        return self.get_pool().submit(indent_batch, [text for text, _ in batch if text is not None])
+
+    @staticmethod
+    def indent_results(batch: list, future) -> iter:
+        """
+        Get results of batch
+
+        :param batch: Items [text, data]
+        :param future: Future of indented texts
+        :return: Iterator of [indented text, data]
+        """
+        indented = iter(future.result())
+        for text, data in batch:
+            yield (None if text is None else next(indented)), data
+
+    def indent_cached(self, texts: [str]) -> [str]:
+        """
+        Get indented form of messages through indent cache, messages not cached are indented by indent_iter
+
+        :param texts: Message texts
+        :return: Indented texts
+        """
+        res = [indent_cache.find(text) for text in texts]
+        items = ([text, i] for i, (text, xml_str) in enumerate(zip(texts, res)) if xml_str is None)
+        for xml_str, i in self.indent_iter(items):
+            indent_cache.put(texts[i], xml_str)
+            res[i] = xml_str
+        return res
+
+    def extract_messages(self, extractor: msgtable.ColumnExtractor, main_column: int, text_lst: [str],
+                         first_index: int) -> msgtable.MsgTable:
+        """
+        Find messages (see msgtable.extract_messages) in next part of result: the first 'min_records' lines
+        of whole result are processed in calling thread, next lines by batches in pool
+
+        :param extractor: Extractor of column values
+        :param main_column: Index of main column
+        :param text_lst: Text lines
+        :param first_index: Index of first line in whole output
+        :return: Table of messages
+        """
+        n_inline = len(text_lst) if not self.is_enabled else max(self.min_records - first_index, 0)
+        table = msgtable.extract_messages(extractor, main_column, text_lst[:n_inline], first_index)
+        if n_inline >= len(text_lst):
+            return table
+
+        pool = self.get_pool()
+        starts = range(n_inline, len(text_lst), self.batch_size)
+        futures = [pool.submit(extract_batch, extractor.msg_columns, main_column,
+                               text_lst[start:start + self.batch_size]) for start in starts]
+        try:
+            for start, future in zip(starts, futures):
+                for i, res in future.result():
+                    table.append_extracted(first_index + start + i, text_lst[start + i], res)
+        finally:
+            for future in futures:
+                future.cancel()
+        return table
+
+
+# Post-processor shared by all modules
+postprocessor = PostProcessor()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         regexes.py
+# Purpose:      Registry of compiled regular expressions
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import re
+import threading
+
+# Log line formats
+
+# date-time header, for example: ./server.log.2019-01-09:21697:2019-01-09 09:56:18,893
+P_DT = re.compile(r"(^[^:]*:[0-9]*:\s*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})")
+
+# line starting with xml tag
+P_XML = re.compile(r".*<\/?.*?:?.+?>")
+
+# xml tag at the line start
+P_XML_TAG = re.compile(r"<\/?.*?:?.+?>")
+
+# SOAP envelope start/end
+P_XML_SOAP_BEG = re.compile(r"(?is).*<(soap-env|soap).*>")
+P_XML_SOAP_END = re.compile(r"(?is).*</(soap-env|soap).*>")
+
+# filename, line number header, for example: ./server.log.2019-01-09:21697:
+P_PREF = re.compile(r"[^:]*:[0-9]*:\s*")
+
+# value of xml tag with any namespace prefix, {0} - tag name
+TAG_VALUE_EXPR = r"(?:.*<.*?:{0}>)(.+?)(?:<\/.*?:{0}>)(?:.*)"
+
+
+class RegexRegistry:
+    """
+    Registry of compiled regular expressions: each expression is compiled once
+    """
+
+    def __init__(self):
+        """
+        Class constructor
+        """
+        self.lock = threading.Lock()
+        self.items = {}  # expression -> compiled pattern
+
+    def get(self, expr: str):
+        """
+        Get compiled pattern
+
+        :param expr: Regular expression
+        :return: Compiled pattern, None - if expression is empty
+        """
+        if not expr:
+            return None
+        p = self.items.get(expr)
+        if p is None:
+            p = re.compile(expr)
+            with self.lock:
+                self.items[expr] = p
+        return p
+
+    def tag_value(self, tag: str):
+        """
+        Get compiled pattern extracting value of xml tag
+
+        :param tag: Tag name
+        :return: Compiled pattern, group 1 - tag value
+        """
+        return self.get(TAG_VALUE_EXPR.format(tag))
+
+
+# Registry shared by all modules
+registry = RegexRegistry()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         resultcache.py
+# Purpose:      Persistent on-disk cache of search results
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+
+# Default max total size (MB) of cache files
+RESULT_CACHE_SIZE = 256
+
+# Extension of cache files
+CACHE_FILE_EXT = '.json.gz'
+
+
+class ResultCache:
+    """
+    Cache of search results: one gzipped json file per key.
+    Least recently used files are removed when total size exceeds the limit
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = RESULT_CACHE_SIZE):
+        """
+        Class constructor
+
+        :param cache_dir: Cache directory (created if it does not exist)
+        :param max_size: Max total size of cache files, MB
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size * 1024 * 1024
+
+        self.lock = threading.Lock()
+
+    def file_name(self, key: list) -> str:
+        """
+        Get cache file name of key
+
+        :param key: Key (list of strings)
+        :return: File name
+        """
+        digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + CACHE_FILE_EXT)
+
+    def load(self, key: list):
+        """
+        Load cached value
+
+        :param key: Key (list of strings)
+        :return: Value, None - key is not cached
+        """
+        file_name = self.file_name(key)
+        try:
+            with gzip.open(file_name, 'rt', encoding='utf-8') as f:
+                item = json.load(f)
+            os.utime(file_name)  # mark as recently used
+        except (OSError, ValueError):
+            return None
+
+        if item.get('key') != key:
+            return None
+        return item.get('value')
+
+    def save(self, key: list, value):
+        """
+        Store value, evict least recently used files if cache is too large
+
+        :param key: Key (list of strings)
+        :param value: Value (json serializable)
+        """
+        file_name = self.file_name(key)
+        tmp_name = file_name + '.tmp' + str(threading.get_ident())
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with gzip.open(tmp_name, 'wt', encoding='utf-8') as f:
+                json.dump({'key': key, 'value': value}, f)
+            os.replace(tmp_name, file_name)
+
+            self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used files until total size fits the limit
+        """
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_FILE_EXT):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         test_block_search.py
+# Purpose:      Tests of record grouping of built-in search output (source mode="block"):
+#               only header lines of records are prefixed by 'file:line:', other lines are kept as they are
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conn
+import logconn
+import localscan
+
+# Record whose body lines look like 'file:line:' prefix
+RECORD = ('2019-01-09 10:12:13,456 INFO  [ru.test.Service] Message\n'
+          '<soap:Envelope><soap:Body><ns:Request xmlns:ns="urn:test">\n'
+          '<time>2019-01-09T10:12:13</time>\n'
+          'a:12: text\n'
+          '</ns:Request></soap:Body></soap:Envelope>\n')
+OTHER = '2019-01-09 10:12:14,000 INFO  [ru.test.Service] Other\n<a>b</a>\n'
+
+
+class BlockSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = logconn.SSHNode(None, 'Node 1', 'node1', '', '', '.', '', '')
+        self.block = conn.Source('server.log', 'server.log*', None, [], conn.SOURCE_MODE_BLOCK)
+        self.cmd = conn.Source('server.log', 'server.log*', None, [], conn.SOURCE_MODE_CMD)
+
+    def check_record(self, record, file_name: str, line_number: int):
+        self.assertEqual(record.file, file_name)
+        self.assertEqual(record.line_number, line_number)
+        self.assertEqual(record.timestamp, '2019-01-09 10:12:13,456')
+        self.assertIn('<time>2019-01-09T10:12:13</time>', record.body)
+        self.assertIn('a:12: text', record.body)
+        self.assertIn('\n  <soap:Body>', record.body)  # XML is indented
+
+    def test_block_output(self):
+        lines = RECORD.split('\n')[:-1]
+        out = ['./server.log:5:' + lines[0] + '\n'] + [line + '\n' for line in lines[1:]]
+        res, can_sort = self.node.prepare_out_str(out, self.block)
+        self.assertTrue(can_sort)
+        self.assertEqual(len(res), 1)
+        self.check_record(res[0], './server.log', 5)
+
+    def test_cmd_output(self):
+        out = ['./server.log:{0}:{1}\n'.format(5 + i, line)  # grep -Hn prefixes all lines
+               for i, line in enumerate(RECORD.split('\n')[:-1])]
+        res, _ = self.node.prepare_out_str(out, self.cmd)
+        self.assertEqual(len(res), 1)
+        self.check_record(res[0], './server.log', 5)
+
+    def test_local_scan(self):
+        with tempfile.TemporaryDirectory() as local_dir:
+            with open(os.path.join(local_dir, 'server.log'), 'w') as f:
+                f.write(OTHER + RECORD + OTHER)
+            out = localscan.search_iter(local_dir, 'server.log*', 'Message', '')
+            res, _ = self.node.prepare_out_str(out, self.block)
+        self.assertEqual(len(res), 1)
+        self.check_record(res[0], './server.log', 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
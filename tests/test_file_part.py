@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         test_file_part.py
+# Purpose:      Tests of reading parts of files by line numbers (get_file_part) on local node
+#               and of their formatting for log view
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conn
+import logconn
+from lineindex import line_index_cache, CHECKPOINT_STEP
+
+try:
+    import logxmlstc  # GUI module, requires wx
+except ImportError:
+    logxmlstc = None
+
+SORT_EXPR = r"(?:.*)(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"
+
+# Lines of file before the first record
+PREFIX = 'started\n'
+# Count of lines of file indexed by checkpoints
+N_LINES = 3 * CHECKPOINT_STEP + 500
+
+
+def record_text(i: int) -> str:
+    """
+    Text of i-th record of test file: header line and 3 lines of XML
+
+    :param i: Index of record
+    :return: Record text
+    """
+    return '2019-01-09 10:{0:02}:{1:02},000 INFO  [ru.test.Service] Message {2}\n' \
+           '<a>\n<b>{2}</b>\n</a>\n'.format(i // 60 % 60, i % 60, i)
+
+
+class FilePartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.dir.name, 'server.log'), 'w') as f:
+            f.write(PREFIX)
+            for i in range(100):
+                f.write(record_text(i))
+
+        self.source = conn.Source('server.log', 'server.log*', None, [], conn.SOURCE_MODE_BLOCK)
+        self.node = logconn.LocalNode(None, 'Node 1', self.dir.name)
+        patterns = conn.Patterns(conn.SortPattern(SORT_EXPR, True), [])
+        self.ng = logconn.SSHNodeGroup(None, 'LOCAL', 'local', [self.node], [self.source], patterns)
+
+    def tearDown(self):
+        self.ng.close()
+        self.dir.cleanup()
+
+    def test_records(self):
+        res = self.ng.get_file_part('server.log', './server.log', 1, 9)
+        self.assertEqual([str(record) for record in res[:1]], ['Node 1:./server.log:1:started\n'])
+        self.assertEqual([(record.file, record.line_number) for record in res[1:]],
+                         [('./server.log', 2), ('./server.log', 6)])
+        self.assertEqual(res[1].timestamp, '2019-01-09 10:00:00,000')
+
+    @unittest.skipIf(logxmlstc is None, 'wx is not installed')
+    def test_format_output_extended(self):
+        res = self.ng.get_file_part('server.log', './server.log', 1, 9)
+        text = logxmlstc.LogXmlSTC.format_output_extended(res)
+        self.assertEqual(len(text), 3)
+        self.assertEqual(text[0], './server.log:1:started\n')
+        self.assertTrue(text[1].startswith('./server.log:2:2019-01-09 10:00:00,000 INFO'))
+        self.assertIn('<a>\n  <b>0</b>\n</a>', text[1])
+        self.assertTrue(text[2].startswith('./server.log:6:2019-01-09 10:00:01,000 INFO'))
+
+
+class FileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.dir.name, 'big.log')
+        self.write_lines(1, N_LINES, 'w')
+
+        self.source = conn.Source('big.log', 'big.log*', None, [], conn.SOURCE_MODE_BLOCK)
+        self.node = logconn.LocalNode(None, 'Node 1', self.dir.name)
+        patterns = conn.Patterns(conn.SortPattern(SORT_EXPR, True), [])
+        self.ng = logconn.SSHNodeGroup(None, 'LOCAL', 'local', [self.node], [self.source], patterns)
+
+    def tearDown(self):
+        self.ng.close()
+        self.dir.cleanup()
+
+    def write_lines(self, first: int, last: int, mode: str = 'a', text: str = 'line'):
+        """
+        Write lines of test file, each line is a record
+
+        :param first: Number of the first line
+        :param last: Number of the last line
+        :param mode: File open mode
+        :param text: Text of lines
+        """
+        with open(self.file_path, mode) as f:
+            for i in range(first, last + 1):
+                f.write('2019-01-09 10:00:00,000 INFO {0} {1}\n'.format(text, i))
+
+    def line_offsets(self) -> dict:
+        """
+        Get byte offsets of lines of test file
+
+        :return: Line number -> byte offset of the line start
+        """
+        offsets = {}
+        with open(self.file_path, 'rb') as f:
+            offset = 0
+            for i, line in enumerate(f, 1):
+                offsets[i] = offset
+                offset += len(line)
+        return offsets
+
+    def get_part(self, num_from: int, num_to: int) -> list:
+        return self.ng.get_file_part('big.log', './big.log', num_from, num_to)
+
+    def get_index(self):
+        return line_index_cache.items[(self.node.pool_key(), self.dir.name, './big.log')]
+
+    def check_part(self, res: list, num_from: int, num_to: int, text: str = 'line'):
+        self.assertEqual([record.line_number for record in res], list(range(num_from, num_to + 1)))
+        self.assertTrue(all(record.file == './big.log' for record in res))
+        self.assertEqual(res[0].body.rstrip('\n'), '2019-01-09 10:00:00,000 INFO {0} {1}'.format(text, num_from))
+        self.assertEqual(res[-1].body.rstrip('\n'), '2019-01-09 10:00:00,000 INFO {0} {1}'.format(text, num_to))
+
+    def check_index(self, last_line: int):
+        index = self.get_index()
+        offsets = self.line_offsets()
+        expected = list(range(1, last_line + 1, CHECKPOINT_STEP))
+        self.assertEqual(list(index.lines), expected)
+        self.assertEqual(list(index.offsets), [offsets[line] for line in expected])
+
+    def test_window(self):
+        num_from = 2 * CHECKPOINT_STEP + 123
+        res = self.get_part(num_from, num_from + 99)
+        self.check_part(res, num_from, num_from + 99)
+        self.check_index(num_from)
+        self.assertEqual(self.get_index().floor(num_from), (2 * CHECKPOINT_STEP + 1,
+                                                            self.line_offsets()[2 * CHECKPOINT_STEP + 1]))
+
+        res = self.get_part(5, 10)  # read from the first checkpoint, index is not changed
+        self.check_part(res, 5, 10)
+        self.check_index(num_from)
+
+    def test_appended(self):
+        res = self.get_part(CHECKPOINT_STEP + 10, CHECKPOINT_STEP + 20)
+        self.check_part(res, CHECKPOINT_STEP + 10, CHECKPOINT_STEP + 20)
+        index = self.get_index()
+
+        self.write_lines(N_LINES + 1, N_LINES + CHECKPOINT_STEP)  # file grew after index was built
+        num_from = N_LINES + 100
+        res = self.get_part(num_from, num_from + 50)
+        self.check_part(res, num_from, num_from + 50)
+        self.assertIs(self.get_index(), index)  # checkpoints are kept, index is extended
+        self.check_index(num_from)
+
+    def test_rewritten(self):
+        res = self.get_part(CHECKPOINT_STEP + 10, CHECKPOINT_STEP + 20)
+        self.check_part(res, CHECKPOINT_STEP + 10, CHECKPOINT_STEP + 20)
+
+        self.write_lines(1, N_LINES + 100, 'r+', 'new line')  # rewritten in place, longer
+        num_from = 2 * CHECKPOINT_STEP + 10
+        res = self.get_part(num_from, num_from + 10)
+        self.check_part(res, num_from, num_from + 10, 'new line')
+        self.check_index(num_from)
+
+
+if __name__ == '__main__':
+    unittest.main()
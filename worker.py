@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         worker.py
+# Purpose:      Background thread for long operations (search etc.), results are delivered to GUI thread
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import threading
+from typing import Callable, Optional
+
+import wx
+
+
+class Worker(threading.Thread):
+    """
+    Background thread: gets output chunks from 'produce_fun', post-processes them with 'process_fun'
+    and passes them to GUI thread (callbacks are called by wx.CallAfter)
+    """
+
+    def __init__(self, produce_fun: Callable, process_fun: Callable, chunk_fun: Callable, done_fun: Callable,
+                 cancel_fun: Optional[Callable] = None):
+        """
+        Class constructor
+
+        :param produce_fun: Function () -> iterator of output chunks (lists)
+        :param process_fun: Function (chunk, count of records processed before chunk) -> post-processed chunk
+        :param chunk_fun: GUI callback (worker, chunk, post-processed chunk)
+        :param done_fun: GUI callback (worker, is cancelled, exception or None)
+        :param cancel_fun: Function cancelling running operation of 'produce_fun'
+        """
+        super().__init__(daemon=True)
+
+        self.produce_fun = produce_fun
+        self.process_fun = process_fun
+        self.chunk_fun = chunk_fun
+        self.done_fun = done_fun
+        self.cancel_fun = cancel_fun
+
+        self.cancelled = threading.Event()
+
+    def run(self):
+        """
+        Thread body
+        """
+        error = None
+        out = None
+        try:
+            out = iter(self.produce_fun())
+            n_done = 0
+            for chunk in out:
+                if self.cancelled.is_set():
+                    break
+                res = self.process_fun(chunk, n_done)
+                n_done += len(chunk)
+                wx.CallAfter(self.chunk_fun, self, chunk, res)
+
+        except Exception as ex:
+            error = ex
+        finally:
+            close = getattr(out, 'close', None)
+            if close is not None:
+                close()  # stop producing generator
+            wx.CallAfter(self.done_fun, self, self.cancelled.is_set(), error)
+
+    def cancel(self):
+        """
+        Cancel operation (called from GUI thread)
+        """
+        self.cancelled.set()
+        if self.cancel_fun:
+            self.cancel_fun()
+
+    def is_running(self) -> bool:
+        """
+        Is operation running? Cancelled operation is running until its thread exits
+        """
+        return self.is_alive()
+
+    def is_cancelling(self) -> bool:
+        """
+        Is operation cancelled, but still running?
+        """
+        return self.is_alive() and self.cancelled.is_set()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# ----------------------------------------------------------------------------
+# Name:         xmlfields.py
+# Purpose:      Single-pass extraction of xml tag values from message text
+#
+# Author:       Sergey Shafranskiy <sergey.shafranskiy@gmail.com>
+#
+# Version:      1.1.5
+# Build:        170
+# Created:      2019-01-16
+# ----------------------------------------------------------------------------
+
+import re
+
+
+class XmlTagScanner:
+    """
+    Extracts values of several xml tags reading message once: one combined regex finds opening tags
+    of all requested names (with any namespace prefix), value is the text up to the matching closing tag.
+    If tag occurs several times, the last value is taken (as regex '(?s)(?:.*<.*:tag>)(.+?)(?:<\\/.*:tag>.*)' does)
+    """
+
+    def __init__(self, tags: [str]):
+        """
+        Class constructor
+
+        :param tags: Tag names (local, without namespace prefix)
+        """
+        self.tags = list(tags)
+
+        names = sorted(set(self.tags), key=len, reverse=True)
+        # group 1 - namespace prefix with ':', group 2 - tag name
+        self.p_open = re.compile(r"<((?:[\w.\-]+:)?)(" + "|".join(re.escape(n) for n in names) + r")(?:\s[^>]*)?>") \
+            if names else None
+
+    def scan(self, text: str) -> dict:
+        """
+        Extract tag values
+
+        :param text: Message text
+        :return: Dictionary tag name -> value, tags that are not found are missing
+        """
+        res = {}
+        if self.p_open is None:
+            return res
+
+        for m in self.p_open.finditer(text):
+            prefix, name = m.group(1), m.group(2)
+            end = text.find("</" + prefix + name + ">", m.end())
+            if end > m.end():  # missing closing tag or empty value is ignored
+                res[name] = text[m.end(): end]
+
+        return res
@@ -45,6 +45,8 @@ class XmlSTC(stc.StyledTextCtrl):
     StyledTextCtrl widget with XML syntax highlighting and support of 'Find' dialog
     """
 
+    MATCH_BATCH_SIZE = 1000  # count of matches styled at once
+
     def __init__(self, parent, id=wx.ID_ANY,
                  pos=wx.DefaultPosition, size=wx.DefaultSize,
                  style=0):
@@ -178,6 +180,9 @@ class XmlSTC(stc.StyledTextCtrl):
 
         self.patterns = None  # regex patterns for custom colourising
 
+        self.matches = []  # original styles of matched text fragments (position, style)
+        self.find_id = 0  # number of the last search, used to stop styling of matches by batches
+
     def custom_colourise(self, patterns):
         """
         Custom colourising of text in widget
@@ -245,6 +250,7 @@ class XmlSTC(stc.StyledTextCtrl):
 
         self.Colourise(0, -1)
         self.matches = []
+        self.find_id += 1  # stop styling of matches
 
         self.custom_colourise(self.patterns)
       
@@ -294,31 +300,58 @@ class XmlSTC(stc.StyledTextCtrl):
 
     def colorize_text(self, styled_text, style):
         """
-        Apply style 'style' to all occurrences of 'styled_text'
+        Apply style 'style' to all occurrences of 'styled_text'.
+        Search is made in UTF-8 bytes of the text, so found positions are STC positions (in bytes) as is.
+        First MATCH_BATCH_SIZE matches are styled at once, the rest - by batches in idle time
         """
         is_match_word = self.data.GetFlags() & wx.FR_WHOLEWORD
-        styled_len = len(styled_text)
-        styled_byte_len = XmlSTC.calcByteLen(styled_text)  # get length of the matched string in bytes
+        styled_bytes = styled_text.encode('utf-8')
+        styled_byte_len = len(styled_bytes)  # length of the matched string in bytes
         self.match_len = styled_byte_len
 
         text = self.GetText()
-        self.end_byte_pos = XmlSTC.calcBytePos(text, len(text)-1)
+        raw = text.encode('utf-8')
+        self.end_byte_pos = len(raw) - len(text[-1:].encode('utf-8'))  # position of the last char in bytes
 
         # Search for all matches of 'styled_text'
-        pos = text.find(styled_text)
-        while pos != -1:
-            next_sym = text[pos + styled_len: pos + styled_len + 1]
-            prev_sym = text[pos - 1: pos]
-
-            if not is_match_word or (
-                    (pos == 0 or prev_sym.isspace()) and (pos == len(text) - styled_len or next_sym.isspace())):
-                byte_pos = XmlSTC.calcBytePos(text, pos)  # convert position in chars to position in bytes
-
-                # Save old style
-                self.matches.append((byte_pos, self.GetStyleAt(byte_pos)))  # (pos in bytes, style number)
-                # Apply new style
-                self.apply_style(byte_pos, self.match_len, 0xFF, style)
-            pos = text.find(styled_text, pos + styled_len)
+        positions = []
+        if styled_byte_len:
+            pos = raw.find(styled_bytes)
+            while pos != -1:
+                next_sym = raw[pos + styled_byte_len: pos + styled_byte_len + 1]
+                prev_sym = raw[pos - 1: pos]
+
+                if not is_match_word or (
+                        (pos == 0 or prev_sym.isspace()) and (pos == len(raw) - styled_byte_len or next_sym.isspace())):
+                    positions.append(pos)
+                pos = raw.find(styled_bytes, pos + styled_byte_len)
+
+        self.find_id += 1  # stop styling of previous search
+        self.style_matches(self.find_id, positions, 0, style)
+
+    def style_matches(self, find_id, positions, start, style):
+        """
+        Apply style to the batch of found positions, schedule styling of the next batch
+
+        :param find_id: Search number, styling is stopped if other search is started or 'Find' dialog is closed
+        :param positions: Positions of matches in bytes
+        :param start: Index of the first position of the batch
+        :param style: Style number
+        """
+        if find_id != self.find_id:
+            return
+
+        end = min(start + self.MATCH_BATCH_SIZE, len(positions))
+        for byte_pos in positions[start: end]:
+            # Save old style
+            self.matches.append((byte_pos, self.GetStyleAt(byte_pos)))  # (pos in bytes, style number)
+            # Apply new style
+            self.apply_style(byte_pos, self.match_len, 0xFF, style)
+
+        if start > 0:  # first batch is finished by on_find
+            self.apply_end_style()
+        if end < len(positions):
+            wx.CallAfter(self.style_matches, find_id, positions, end, style)
 
     def apply_end_style(self):
         self.apply_style(self.end_byte_pos, 1, 0xFF, self.GetStyleAt(self.end_byte_pos))
\ No newline at end of file